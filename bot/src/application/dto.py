@@ -1,13 +1,13 @@
-from typing import Union
 from dataclasses import dataclass
 
-from aiogram.types import Message
+from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
 
 @dataclass(slots=True)
 class PaginateAnswerDto:
-    answer: str
-    user_id: Union[str,int]
+    callback: CallbackQuery
+    answer_uuid: str
+    page: int
 
 
 @dataclass(slots=True, frozen=True)
@@ -16,6 +16,12 @@ class StartDto:
     state: FSMContext
 
 
+@dataclass(slots=True, frozen=True)
+class AutomaticModeDto:
+    message: Message
+    state: FSMContext
+
+
 @dataclass(slots=True)
 class QuestionHandlerDto:
     user_id: str|int
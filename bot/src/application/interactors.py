@@ -1,25 +1,38 @@
-from redis.asyncio import Redis
-
-from bot.src.application.interfaces import AnswersGetter, AnswersHandler, Start, UUIDGenerator
+from bot.src.application.interfaces import (
+    AnswerSender,
+    AnswersGetter,
+    AnswersHandler,
+    ApiProvider,
+    MessagePaginator,
+    Start,
+    UUIDGenerator
+)
 from bot.src.controllers.bot_states import UserStates
-from bot.src.domain.entities import QuestionHandlerDm, StartDm
-from src.application.dto import PaginateAnswerDto, QuestionHandlerDto, StartDto
-from  src.infrastructure.message_paginator import PaginatorGateway
+from bot.src.domain.entities import (
+    AnswerPageDm,
+    ApiRequest,
+    MessagePaginatorDm,
+    QuestionHandlerDm,
+    SendAnswerDm,
+    SendAnswerPageDm,
+    StartDm
+)
+from bot.src.application.dto import AutomaticModeDto, PaginateAnswerDto, QuestionHandlerDto, StartDto
 
 class PaginationInteractor:
     def __init__(
         self, 
-        redis: Redis,
-        pagination_gateway: PaginatorGateway
+        answers_getter_gateway: AnswersGetter,
+        pagination_gateway: MessagePaginator
     ) -> None:
-        self._redis = redis
+        self._answers_getter_gateway = answers_getter_gateway
         self._pagination_gateway = pagination_gateway
 
-    async def __call__(self, params: PaginateAnswerDto) -> str:
-        pages = await self._pagination_gateway.paginate_text(params.answer)
-        await self._redis.set(f"user:{params.user_id}:pages", "|".join(pages))
-        await self._redis.set(f"user:{params.user_id}:current_page", 0)
-        return pages[0]
+    async def __call__(self, params: PaginateAnswerDto) -> None:
+        page = await self._answers_getter_gateway.get_answer_page(params.answer_uuid, params.page)
+        await self._pagination_gateway.paginate_message(
+            MessagePaginatorDm(callback=params.callback, page=page)
+        )
 
 
 class StartInteractor:
@@ -47,7 +60,7 @@ class CustomModelQueryHandler:
         self._answers_handler_gateway = answers_handler_gateway
         self._answers_getter_gateway = answers_getter_gateway
 
-    async def __call__(self, params: QuestionHandlerDto) -> dict[str, str]:
+    async def __call__(self, params: QuestionHandlerDto) -> dict[str, str | int]:
         dm = QuestionHandlerDm(
             user_id=params.user_id,
             question=params.question,
@@ -55,6 +68,51 @@ class CustomModelQueryHandler:
         )
         try:
             response = await self._answers_handler_gateway.send_and_receive(dm)
-            await self._answers_getter_gateway.get_saved_answers(response.answer_uuid)
+            if response["below_threshold"]:
+                return {"status": "below_threshold"}
+            page = await self._answers_getter_gateway.get_answer_page(response["answer_uuid"], 0)
+            if page is None:
+                return {"status": "not_found"}
+            return {
+                "status": "ok",
+                "answer_uuid": page.answer_uuid,
+                "text": page.text,
+                "total_pages": page.total_pages
+            }
         except Exception as e:
             return {"status": "error", "message": str(e)}
+
+
+class AutomaticModeInteractor:
+    def __init__(
+        self,
+        custom_model_handler: CustomModelQueryHandler,
+        api_gateway: ApiProvider,
+        answer_sender_gateway: AnswerSender,
+    ) -> None:
+        self._custom_model_handler = custom_model_handler
+        self._api_gateway = api_gateway
+        self._answer_sender_gateway = answer_sender_gateway
+
+    async def __call__(self, params: AutomaticModeDto) -> None:
+        result = await self._custom_model_handler(
+            QuestionHandlerDto(user_id=params.message.from_user.id, question=params.message.text)
+        )
+        if result["status"] == "ok":
+            await self._answer_sender_gateway.send_answer_page(
+                SendAnswerPageDm(
+                    message=params.message,
+                    page=AnswerPageDm(
+                        answer_uuid=result["answer_uuid"],
+                        text=result["text"],
+                        page=0,
+                        total_pages=result["total_pages"]
+                    )
+                )
+            )
+            return
+        # below the threshold, no stored answer or no reply in time: ask the external model
+        text = await self._api_gateway.main(ApiRequest(role="user", content=params.message.text))
+        await self._answer_sender_gateway.send_answer(
+            SendAnswerDm(message=params.message, state=params.state, text=text)
+        )
@@ -1,11 +1,14 @@
 from typing import Optional, Protocol
 from abc import abstractmethod
-from uuid import UUID
 
 from bot.src.domain.entities import (
+    AnswerPageDm,
+    ApiRequest,
     MessagePaginatorDm, 
     QuestionHandlerDm, 
     ResponseMessage, 
+    SendAnswerDm,
+    SendAnswerPageDm,
     StartDm
 )
 
@@ -17,12 +20,12 @@ class Start(Protocol):
 
 class AnswersGetter(Protocol):
     @abstractmethod
-    async def get_saved_answers(self, uuid: str) -> Optional[list[str]]: ...
+    async def get_answer_page(self, uuid: str, page: int) -> Optional[AnswerPageDm]: ...
 
 
 class ApiProvider(Protocol):
     @abstractmethod
-    async def main(message: dict[str:str]) -> str: ...
+    async def main(self, message: ApiRequest) -> str: ...
 
 
 class MessagePaginator(Protocol):
@@ -30,9 +33,12 @@ class MessagePaginator(Protocol):
     async def paginate_message(self, params: MessagePaginatorDm) -> None: ...
 
 
-class AnswersGetter(Protocol):
+class AnswerSender(Protocol):
+    @abstractmethod
+    async def send_answer(self, params: SendAnswerDm) -> None: ...
+
     @abstractmethod
-    async def get_saved_answers(self, uuid: str) -> Optional[list[str]]: ...
+    async def send_answer_page(self, params: SendAnswerPageDm) -> None: ...
 
 
 class AnswersHandler(Protocol):
@@ -41,4 +47,4 @@ class AnswersHandler(Protocol):
 
 
 class UUIDGenerator(Protocol):
-    def __call__(self) -> UUID: ...
\ No newline at end of file
+    def __call__(self) -> str: ...
\ No newline at end of file
@@ -1,23 +1,31 @@
 import asyncio
 from aiogram import Bot, Dispatcher, types
 from aiogram.fsm.context import FSMContext
-from aiogram.filters import Command
 from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.filters import Command
+from dishka import make_async_container
+from dishka.integrations.aiogram import AiogramProvider, FromDishka, inject, setup_dishka
 
-from src.infrastructure.redis_storage import init_redis_storage
-from controllers.bot_states import UserStates
-from src.config import Config, BotConfig
+from bot.src.application.dto import AutomaticModeDto
+from bot.src.application.interactors import AutomaticModeInteractor
+from bot.src.controllers.bot_states import UserStates
+from bot.src.config import Config
+from bot.src.ioc import MyProvider
 
 
 
 config = Config()
-storage = init_redis_storage(config)
 
 
-async def main(config: BotConfig, storage: RedisStorage):
-    storage = await init_redis_storage()
-    bot = Bot(token=config.token, parse_mode=config.parse_mode)
+async def main(config: Config):
+    bot = Bot(token=config.bot.token, parse_mode=config.bot.parse_mode)
+    container = make_async_container(
+        MyProvider(), AiogramProvider(), context={Config: config, Bot: bot}
+    )
+    # the FSM storage runs on the same APP-scoped client, and pool, as the gateways
+    storage = await container.get(RedisStorage)
     dp = Dispatcher(storage=storage)
+    setup_dishka(container=container, router=dp)
 
     # Команда /start
     @dp.message(Command("start"))
@@ -38,12 +46,16 @@ async def main(config: BotConfig, storage: RedisStorage):
         await message.reply("Бот в ручном режиме. Напишите ваш вопрос.")
         await state.set_state(UserStates.manual_mode)
 
-    # Обработка сообщений в автоматическом режиме
+    # Обработка сообщений в автоматическом режиме: уверенный ответ модели
+    # отправляется сразу, остальные вопросы уходят во внешнюю модель
     @dp.message(UserStates.automatic_mode)
-    async def handle_automatic_mode(message: types.Message, state: FSMContext):
-        # Обработка автоматического запроса
-        response = f"Автоматически обработан ваш запрос: {message.text}"
-        await message.reply(response)
+    @inject
+    async def handle_automatic_mode(
+        message: types.Message,
+        state: FSMContext,
+        interactor: FromDishka[AutomaticModeInteractor]
+    ):
+        await interactor(AutomaticModeDto(message, state))
 
     # Обработка сообщений в ручном режиме
     @dp.message(UserStates.manual_mode)
@@ -55,7 +67,8 @@ async def main(config: BotConfig, storage: RedisStorage):
     try:
         await dp.start_polling(bot)
     finally:
+        await container.close()
         await bot.session.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(config))
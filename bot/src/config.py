@@ -1,10 +1,18 @@
 from os import environ as env
-from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from common.pagination import normalize_parse_mode
 
 
 class BotConfig(BaseModel):
     token: str = Field(alias="BOT_TOKEN")
-    parse_mode: str = Field(alias="BOT_PARSE_MODE")
+    parse_mode: Optional[Literal["HTML", "Markdown", "MarkdownV2"]] = Field(alias="BOT_PARSE_MODE", default=None)
+    # pages are cut by sentence_bert with its own parse mode, the bot has to send them with the same one
+    answer_parse_mode: Optional[Literal["HTML", "Markdown", "MarkdownV2"]] = Field(
+        alias="BERT_ANSWER_PARSE_MODE", default=None
+    )
     max_length: int = Field(alias="BOT_ANSWER_MAX_LENGTH")
     group_id: str = Field(alias="BOT_GROUP_CHAT_ID")
     allowed_users: list[int] = Field(alias="BOT_ALLOWED_USERS")
@@ -13,12 +21,29 @@ class BotConfig(BaseModel):
     def split_allowed_users(cls, value):
         return [int(user.strip()) for user in value.split(",")] if isinstance(value, str) else value
 
+    @field_validator("parse_mode", "answer_parse_mode", mode="before")
+    def normalize_parse_modes(cls, value):
+        return normalize_parse_mode(value) if isinstance(value, str) or value is None else value
+
+    @model_validator(mode="after")
+    def check_parse_modes(self):
+        if self.parse_mode != self.answer_parse_mode:
+            raise ValueError(
+                f"BOT_PARSE_MODE={self.parse_mode!r} does not match BERT_ANSWER_PARSE_MODE={self.answer_parse_mode!r}"
+            )
+        return self
+
 
 class RedisConfig(BaseModel):
     host: str = Field(alias="REDIS_HOST")
     port: int = Field(alias="REDIS_PORT")
     password: str = Field(alias="REDIS_PASSWORD")
     db: int = Field(alias="REDIS_DB")
+    max_connections: int = Field(alias="REDIS_MAX_CONNECTIONS", default=32, gt=0)
+    pool_timeout: float = Field(alias="REDIS_POOL_TIMEOUT", default=5.0, gt=0)
+    socket_timeout: float = Field(alias="REDIS_SOCKET_TIMEOUT", default=5.0, gt=0)
+    socket_connect_timeout: float = Field(alias="REDIS_SOCKET_CONNECT_TIMEOUT", default=2.0, gt=0)
+    health_check_interval: int = Field(alias="REDIS_HEALTH_CHECK_INTERVAL", default=30, ge=0)
 
 
 class RabbitMQConfig(BaseModel):
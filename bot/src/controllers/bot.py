@@ -13,11 +13,15 @@ from redis.asyncio import Redis
 from dishka.integrations.aiogram import FromDishka as Depends, inject
 from faststream.rabbit import RabbitRouter
 
-from bot.src.application.dto import QuestionHandlerDto, StartDto
-from bot.src.application.interactors import CustomModelQueryHandler, StartInteractor
+from bot.src.application.dto import PaginateAnswerDto, QuestionHandlerDto, StartDto
+from bot.src.application.interactors import (
+    CustomModelQueryHandler,
+    PaginationInteractor,
+    StartInteractor
+)
 from bot.src.controllers.filters import CustomFilter
 from bot.src.controllers.bot_states import UserStates
-from bot.src.controllers.keyboards import get_keyboard, get_pagination_keyboard
+from bot.src.controllers.keyboards import get_keyboard
 
 AnswersController = RabbitRouter()
 router = Router()
@@ -83,25 +87,13 @@ class BotRouters:
     @inject
     async def pagination_handler(
         callback: CallbackQuery, 
-        user: Depends[User],
-        redis: Depends[Redis]
+        interactor: Depends[PaginationInteractor]
     ) -> None:
-        user_id = user.id
-        current_page = int(callback.data.split("_")[1])
-        pages_data: Optional[bytes] = await redis.get(f"user:{user_id}:pages")
-        if not pages_data:
-            await callback.answer("Ошибка: страницы не найдены.", show_alert=True)
-            return
-        pages = pages_data.decode("utf-8").split("|")
-        if current_page < 0 or current_page >= len(pages):
+        _, answer_uuid, page = callback.data.split("_")
+        if int(page) < 0:
             await callback.answer("Ошибка: неверный номер страницы.", show_alert=True)
             return
-        await redis.set(f"user:{user_id}:current_page", current_page)
-        await callback.message.edit_text(
-            text=pages[current_page],
-            reply_markup=get_pagination_keyboard(current_page=current_page, total_pages=len(pages))
-        )
-        await callback.answer()
+        await interactor(PaginateAnswerDto(callback, answer_uuid, int(page)))
 
     @router.message()
     @inject
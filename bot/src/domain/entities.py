@@ -2,7 +2,7 @@ from dataclasses import dataclass, asdict, field
 from typing import Optional, TypedDict
 
 from aiogram import Bot
-from aiogram.types import User, CallbackQuery, Message
+from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
 
 class AsDict:
@@ -16,11 +16,18 @@ class ApiRequest(AsDict):
     content: str
 
 
+@dataclass(slots=True, frozen=True)
+class AnswerPageDm:
+    answer_uuid: str
+    text: str
+    page: int
+    total_pages: int
+
+
 @dataclass(slots=True, frozen=True)
 class MessagePaginatorDm:
-    user: User 
     callback: CallbackQuery
-    pages: Optional[list[str]]
+    page: Optional[AnswerPageDm]
 
 
 @dataclass(slots=True, frozen=True)
@@ -40,11 +47,25 @@ class StartDm:
 class SendAnswerDm:
     message: Message
     state: FSMContext
+    text: str
+
+
+@dataclass(slots=True, frozen=True)
+class SendAnswerPageDm:
+    message: Message
+    page: AnswerPageDm
+
+
+class ScoredAnswer(TypedDict):
+    uuid: str
+    score: float
 
 
 class ResponseMessage(TypedDict):
     user_id: int
-    answer_uuid: str
+    answer_uuid: Optional[str]
+    answers: list[ScoredAnswer]
+    below_threshold: bool
 
 
 @dataclass(slots=True)
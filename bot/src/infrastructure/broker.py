@@ -1,7 +1,7 @@
 from faststream.rabbit import RabbitBroker
 from faststream.security import SASLPlaintext
 
-from src.config import RabbitMQConfig
+from bot.src.config import RabbitMQConfig
 
 
 def new_broker(rabbitmq_config: RabbitMQConfig) -> RabbitBroker:
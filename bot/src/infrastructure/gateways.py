@@ -1,4 +1,5 @@
 import asyncio
+import time
 from typing import Optional
 import json
 import uuid
@@ -19,13 +20,14 @@ from faststream.rabbit import (
     RabbitBroker
 )
 
-from bot.src.application.interfaces import AnswersGetter, ApiProvider, MessagePaginator
+from common.pagination import TELEGRAM_MESSAGE_LIMIT, Paginator
+from bot.src.application.interfaces import AnswerSender, AnswersGetter, AnswersHandler, ApiProvider, MessagePaginator
 from bot.src.config import BotConfig
-from bot.src.domain.entities import ApiRequest, MessagePaginatorDm, QuestionHandlerDm, ResponseMessage, SendAnswerDm, SendMessageGroupDm, StartDm
+from bot.src.domain.entities import AnswerPageDm, ApiRequest, MessagePaginatorDm, QuestionHandlerDm, ResponseMessage, SendAnswerDm, SendAnswerPageDm, SendMessageGroupDm, StartDm
 
 controller = RabbitRouter()
 
-class ApiProviderGateway(ApiProvider):
+class ApiProviderGateway(ApiProvider, AnswersHandler):
     response_futures: dict[str|int, asyncio.Future] = {}
 
     def __init__(
@@ -53,12 +55,13 @@ class ApiProviderGateway(ApiProvider):
             print(f"Error {e}")
             return "Error, response not created, please try again"
 
+    @staticmethod
     @controller.subscriber("send_answer")
-    async def handle_response(self, message: RabbitMessage) -> None:
+    async def handle_response(message: RabbitMessage) -> None:
+        futures = ApiProviderGateway.response_futures
         correlation_id = message.correlation_id
-        if correlation_id and correlation_id in self.response_futures:
-            self.response_futures[correlation_id].set_result(message.body)
-            del self.response_futures[correlation_id]
+        if correlation_id and correlation_id in futures:
+            futures.pop(correlation_id).set_result(message.body)
 
 
     async def send_and_receive(self, params: QuestionHandlerDm) -> ResponseMessage:
@@ -67,13 +70,15 @@ class ApiProviderGateway(ApiProvider):
         await self._broker.publish(
             {"user_id": params.user_id, "question": params.question},
             routing_key="question_handler",
-            correlation_id=params.correlation_id
+            correlation_id=params.correlation_id,
+            headers={"x-published-at": time.time()}
         )
         try:
             response = await asyncio.wait_for(future, timeout=params.timeout)
             data: ResponseMessage = json.loads(response)
-            await self._redis.set(f"user_answer:{params.user_id}:", data.answer_uuid)
-            return response
+            if data["answer_uuid"] is not None:
+                await self._redis.set(f"user_answer:{params.user_id}:", data["answer_uuid"])
+            return data
         except json.JSONDecodeError as e:
             raise ValueError(f"Ошибка десериализации: {e}")
         except asyncio.TimeoutError:
@@ -83,6 +88,7 @@ class ApiProviderGateway(ApiProvider):
 class BotGateways(
     MessagePaginator,
     AnswersGetter,
+    AnswerSender,
 ):
     def __init__(
         self,
@@ -93,6 +99,10 @@ class BotGateways(
         self._bot = bot
         self._redis = redis
         self._config = config
+        self._paginator = Paginator(
+            min(config.max_length, TELEGRAM_MESSAGE_LIMIT),
+            config.parse_mode
+        )
 
     async def start(self, params: StartDm) -> None:
         await params.state.set_state(params.current_state)
@@ -101,61 +111,63 @@ class BotGateways(
             reply_markup=self.get_manual_keyboard()
         )
 
-    async def get_saved_answers(self, uuid: str) -> Optional[list[str]]:
-        async with self._redis as redis:
-            serialized_data = await redis.get(f"answer:{uuid}")
-            if not serialized_data:
-                return None
-            return json.loads(serialized_data)
+    async def get_answer_page(self, uuid: str, page: int) -> Optional[AnswerPageDm]:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.lindex(f"answer:{uuid}", page)
+            pipe.llen(f"answer:{uuid}")
+            text, total_pages = await pipe.execute()
+        if text is None:
+            return None
+        return AnswerPageDm(
+            answer_uuid=uuid,
+            text=text.decode(),
+            page=page,
+            total_pages=total_pages
+        )
 
     async def send_answer(self, params: SendAnswerDm) -> None:
+        for page in self._paginator.paginate(params.text):
+            await params.message.reply(text=page)
         await params.message.reply(
-                text=
-                    f"{params.message}"
-                    "Используйте кнопку ниже, чтобы задать вопрос техподдержке:",
-                reply_markup=self.get_manual_keyboard()
-            )
+            text="Используйте кнопку ниже, чтобы задать вопрос техподдержке:",
+            reply_markup=self.get_manual_keyboard()
+        )
+
+    async def send_answer_page(self, params: SendAnswerPageDm) -> None:
+        await params.message.reply(
+            text=params.page.text,
+            reply_markup=self.get_pagination_keyboard(params.page)
+        )
 
     async def get_current_answer(self, user_id: int|str) -> str:
         response = await self._redis.get(f"user_answer:{user_id}:")
         return json.loads(response)
 
     async def paginate_message(self, params: MessagePaginatorDm) -> None:
-        current_page = int(params.callback.data.split("_")[1])
-        if not params.pages:
-            await params.callback.answer("Ошибка: данные не найдены.", show_alert=True)
-            return
-        if len(params.pages) == 1:
-            await params.callback.message.edit_text(text=params.pages[0])
-            await params.callback.answer()
+        page = params.page
+        if page is None:
+            await params.callback.answer("Ошибка: страница не найдена.", show_alert=True)
             return
-        if current_page < 0 or current_page >= len(params.pages):
-            await params.callback.answer("Ошибка: неверный номер страницы.", show_alert=True)
-            return
-        await self._redis.set(f"user:{params.user.id}:current_page", current_page)
         await params.callback.message.edit_text(
-            text=params.pages[current_page],
-            reply_markup=self.get_pagination_keyboard(
-                current_page=current_page,
-                total_pages=len(params.pages)
-            )
+            text=page.text,
+            reply_markup=self.get_pagination_keyboard(page)
         )
         await params.callback.answer()
 
-    def get_pagination_keyboard(self, current_page: int, total_pages: int) -> InlineKeyboardMarkup:
+    def get_pagination_keyboard(self, page: AnswerPageDm) -> InlineKeyboardMarkup:
         buttons = []
-        if current_page > 0:
+        if page.page > 0:
             buttons.append(
                 InlineKeyboardButton(
                     text="⬅ Назад",
-                    callback_data=f"page_{current_page - 1}"
+                    callback_data=f"page_{page.answer_uuid}_{page.page - 1}"
                 )
             )
-        if current_page < total_pages - 1:
+        if page.page < page.total_pages - 1:
             buttons.append(
                 InlineKeyboardButton(
                     text="Вперед ➡", 
-                    callback_data=f"page_{current_page + 1}"
+                    callback_data=f"page_{page.answer_uuid}_{page.page + 1}"
                 )
             )
         buttons.append(
@@ -165,29 +177,6 @@ class BotGateways(
             )
         return InlineKeyboardMarkup(inline_keyboard=[buttons])
 
-    async def paginate_text(self, text: str) -> list[str]:
-        min_length = 2048
-        max_length = 4096
-        chunks = []
-        i = 0
-        while i < len(text):
-            chunk_size = max_length if (len(text) - i) > max_length \
-                else min(max_length, len(text) - i)
-            chunks.append(text[i:i + chunk_size])
-            i += chunk_size
-        if len(chunks[-1]) < min_length:
-            last_chunk = chunks.pop()
-            total_length = sum(len(chunk) for chunk in chunks) + len(last_chunk)
-            avg_length = total_length // len(chunks)
-            redistributed_chunks = []
-            start = 0
-            for _ in range(len(chunks)):
-                redistributed_chunks.append(text[start:start + avg_length])
-                start += avg_length
-            redistributed_chunks.append(text[start:])
-            return redistributed_chunks
-        return chunks
-
     def get_manual_keyboard(self) -> InlineKeyboardMarkup:
         return InlineKeyboardMarkup(
             inline_keyboard=[
@@ -208,13 +197,13 @@ class BotGateways(
                     from_chat_id=params.message.chat.id, 
                     message_id=params.message.message_id
                 )
-                self._redis.set(f"group_message:{forwarded_message.message_id}", params.message.from_user.id)
+                await self._redis.set(f"group_message:{forwarded_message.message_id}", params.message.from_user.id)
             except Exception as e:
                 await params.message.reply(f"Ошибка при пересылке сообщения: {e}")
 
     async def reply_to_user(self, message: Message) -> None:
         if message.reply_to_message:
-            user_id = self._redis.get(f"group_message:{message.reply_to_message.message_id}")
+            user_id = await self._redis.get(f"group_message:{message.reply_to_message.message_id}")
             if user_id:
                 user_id = int(user_id)
                 sender = message.from_user
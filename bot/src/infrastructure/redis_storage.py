@@ -1,15 +1,21 @@
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
 from aiogram.fsm.storage.redis import RedisStorage
 
 from bot.src.config import RedisConfig
 
-async def init_redis(config: RedisConfig) -> Redis:
-    return Redis(
-        host=config.host, 
-        port=config.port, 
+def init_redis(config: RedisConfig) -> Redis:
+    pool = BlockingConnectionPool(
+        max_connections=config.max_connections,
+        timeout=config.pool_timeout,
+        host=config.host,
+        port=config.port,
         db=config.db,
-        password=config.password
+        password=config.password,
+        socket_timeout=config.socket_timeout,
+        socket_connect_timeout=config.socket_connect_timeout,
+        health_check_interval=config.health_check_interval
     )
+    return Redis.from_pool(pool)
 
-async def init_redis_storage(config: RedisConfig) -> RedisStorage:
-    return RedisStorage(redis=init_redis(config))
\ No newline at end of file
+def init_redis_storage(redis: Redis) -> RedisStorage:
+    return RedisStorage(redis=redis)
@@ -1,16 +1,81 @@
 from collections.abc import AsyncIterator
+from uuid import uuid4
 
 from aiogram import Bot
+from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.types import Chat, TelegramObject, User
-from dishka import Provider, Scope, provide, from_context
+from dishka import AnyOf, Provider, Scope, provide, from_context
 from dishka.integrations.aiogram import AiogramMiddlewareData
+from faststream.rabbit import RabbitBroker
+from g4f.Provider import BaseProvider
+from redis.asyncio import Redis
 
-from bot.src.config import Config
+from bot.src.application import interfaces
+from bot.src.application.interactors import AutomaticModeInteractor, CustomModelQueryHandler
+from bot.src.config import BotConfig, Config
+from bot.src.infrastructure import factories
+from bot.src.infrastructure.broker import new_broker
+from bot.src.infrastructure.gateways import ApiProviderGateway, BotGateways, controller
+from bot.src.infrastructure.redis_storage import init_redis, init_redis_storage
 
 class MyProvider(Provider):
     config = from_context(provides=Config, scope=Scope.APP)
     bot = from_context(provides=Bot, scope=Scope.APP)
 
+    @provide(scope=Scope.APP)
+    def get_bot_config(self, config: Config) -> BotConfig:
+        return config.bot
+
+    @provide(scope=Scope.APP)
+    async def get_redis(self, config: Config) -> AsyncIterator[Redis]:
+        redis = init_redis(config.redis)
+        try:
+            yield redis
+        finally:
+            await redis.aclose()
+
+    @provide(scope=Scope.APP)
+    def get_storage(self, redis: Redis) -> RedisStorage:
+        return init_redis_storage(redis)
+
+    @provide(scope=Scope.APP)
+    async def get_broker(self, config: Config) -> AsyncIterator[RabbitBroker]:
+        broker = new_broker(config.rabbitmq)
+        # answers from sentence_bert come back through the gateway's subscriber
+        broker.include_router(controller)
+        await broker.start()
+        try:
+            yield broker
+        finally:
+            await broker.close()
+
+    @provide(scope=Scope.APP)
+    def get_api_provider(self) -> BaseProvider:
+        return factories.get_copilot_provider()
+
+    @provide(scope=Scope.APP)
+    def get_uuid_generator(self) -> interfaces.UUIDGenerator:
+        return lambda: str(uuid4())
+
+    api_gateway = provide(
+        ApiProviderGateway,
+        scope=Scope.REQUEST,
+        provides=AnyOf[interfaces.ApiProvider, interfaces.AnswersHandler]
+    )
+
+    bot_gateways = provide(
+        BotGateways,
+        scope=Scope.REQUEST,
+        provides=AnyOf[
+            interfaces.MessagePaginator,
+            interfaces.AnswersGetter,
+            interfaces.AnswerSender
+        ]
+    )
+
+    custom_model_handler = provide(CustomModelQueryHandler, scope=Scope.REQUEST)
+    automatic_mode_interactor = provide(AutomaticModeInteractor, scope=Scope.REQUEST)
+
     @provide(scope=Scope.REQUEST)
     async def get_user(self, obj: TelegramObject) -> User:
         return obj.from_user
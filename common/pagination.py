@@ -0,0 +1,471 @@
+"""Telegram message pagination shared by the bot and sentence_bert.
+
+Text is cut into pages in a single left-to-right pass. Each page ends at the
+last paragraph, line, sentence or word boundary that leaves it at least half
+full, and only falls back to a hard cut between grapheme clusters when no
+such boundary exists. Length is measured as Telegram measures it: in UTF-16
+code units of the text that remains after entity parsing. With an HTML or
+Markdown ``parse_mode`` tags, entities and escapes are never split, and
+entities still open at a cut are closed at the end of the page and reopened
+at the start of the next one.
+"""
+import re
+import unicodedata
+from html import unescape
+from typing import Iterator, NamedTuple, Optional
+
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+PARSE_MODES = ("HTML", "Markdown", "MarkdownV2")
+
+# break priorities, best first
+PARAGRAPH, LINE, SENTENCE, WORD = range(4)
+
+# piece kinds: RUN is text without newlines or markup, PREFIX reopens entities
+RUN, NEWLINE, BLANK_LINE, ATOM, OPEN, CLOSE, TOGGLE, PREFIX = range(8)
+
+_SENTENCE_END = ".!?…"
+_SENTENCE_TRAILERS = "\"')]»”’"
+_LAST_SENTENCE_END = re.compile(r".*[.!?…][\"')\]»”’]*(?=[ \t])", re.DOTALL)
+_LEADING_SPACE = re.compile(r"[^\S\n]+")
+_LINES = r"(?P<blank_line>\r?\n(?:[^\S\n]*\n)+)|(?P<newline>\r?\n)"
+_PLAIN_TOKENS = re.compile(_LINES + r"|(?P<run>[^\n]+)")
+_HTML_TOKENS = re.compile(
+    r"(?P<tag></?[a-zA-Z][^<>]*>)|(?P<entity>&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[a-zA-Z]+);)|"
+    + _LINES + r"|(?P<run>[^\n<&]+|[<&])"
+)
+_MARKDOWN_V2_TOKENS = re.compile(
+    r"(?P<escape>\\.)|(?P<link>!?\[(?:[^\[\]\\\n]|\\.)*\]\((?:[^()\\]|\\.)*\))|"
+    r"(?P<pre>```[^\n`\\]*\n?)|(?P<toggle>\|\||__|[*_~`])|"
+    + _LINES + r"|(?P<run>[^\n\\*_~`|\[]+|[\\|\[])",
+    re.DOTALL
+)
+_MARKDOWN_TOKENS = re.compile(
+    r"(?P<escape>\\[_*`\[])|(?P<link>\[[^\[\]\n]*\]\([^()\s]*\))|"
+    r"(?P<pre>```[^\n`\\]*\n?)|(?P<toggle>[*_`])|"
+    + _LINES + r"|(?P<run>[^\n\\*_`\[]+|[\\\[])"
+)
+_HTML_TAG_NAME = re.compile(r"</?\s*([a-zA-Z0-9-]+)")
+# markup inside these is literal text
+_VERBATIM = ("`", "```")
+# whitespace inside these is content and survives a cut
+_PREFORMATTED = ("`", "```", "pre", "code")
+
+
+def utf16_length(text: str) -> int:
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+def normalize_parse_mode(value: Optional[str]) -> Optional[str]:
+    """Maps a configured parse mode onto its Telegram spelling; an empty value
+    means plain text."""
+    if not value:
+        return None
+    for parse_mode in PARSE_MODES:
+        if parse_mode.lower() == value.strip().lower():
+            return parse_mode
+    raise ValueError(f"unsupported parse_mode {value!r}")
+
+
+def _is_regional_indicator(char: str) -> bool:
+    return "\U0001f1e6" <= char <= "\U0001f1ff"
+
+
+def _continues_cluster(text: str, i: int) -> bool:
+    """Whether ``text[i]`` belongs to the grapheme cluster of ``text[i - 1]``."""
+    char, previous = text[i], text[i - 1]
+    if _is_regional_indicator(char):
+        run = 0
+        while run < i and _is_regional_indicator(text[i - 1 - run]):
+            run += 1
+        return run % 2 == 1
+    return (
+        unicodedata.category(char) in ("Mn", "Mc", "Me")
+        or char == "\u200d"
+        or previous == "\u200d"
+        or "\ufe00" <= char <= "\ufe0f"
+        or "\U0001f3fb" <= char <= "\U0001f3ff"
+        or "\U000e0020" <= char <= "\U000e007f"
+        or (previous == "\r" and char == "\n")
+    )
+
+
+def fitting_prefix(text: str, limit: int) -> int:
+    """Length of the longest prefix of ``text`` that fits in ``limit`` UTF-16
+    units and does not end inside a grapheme cluster."""
+    # every character takes at least one unit, so only the first ``limit`` matter
+    head = text[:max(limit, 0)]
+    size = len(head)
+    if utf16_length(head) > limit:
+        low, high = 0, size
+        while low < high:
+            middle = (low + high + 1) // 2
+            if utf16_length(head[:middle]) <= limit:
+                low = middle
+            else:
+                high = middle - 1
+        size = low
+    while 0 < size < len(text) and _continues_cluster(text, size):
+        size -= 1
+    return size
+
+
+def _cluster_end(text: str, start: int) -> int:
+    end = start + 1
+    while end < len(text) and _continues_cluster(text, end):
+        end += 1
+    return end
+
+
+class _Token(NamedTuple):
+    kind: int
+    raw: str
+    units: int
+    key: str = ""
+
+
+class _Open(NamedTuple):
+    """One entry of a persistent stack of open entities, so that taking a
+    snapshot at every candidate break costs O(1)."""
+
+    parent: Optional["_Open"]
+    key: str
+    opening: str
+    closing: str
+    close_units: int
+    reopen_units: int
+
+
+class _Break(NamedTuple):
+    """The page ends ``offset`` characters into the piece at ``position``."""
+
+    position: int
+    offset: int
+    used: int
+    stack: Optional[_Open]
+
+
+def _close_units(stack: Optional[_Open]) -> int:
+    return stack.close_units if stack is not None else 0
+
+
+def _reopen_units(stack: Optional[_Open]) -> int:
+    return stack.reopen_units if stack is not None else 0
+
+
+def _preformatted(stack: Optional[_Open]) -> bool:
+    return stack is not None and stack.key in _PREFORMATTED
+
+
+def _is_content(kind: int, piece: str) -> bool:
+    """Whether the piece puts visible text on the page; Telegram rejects
+    messages that are empty or whitespace only."""
+    return kind == ATOM or (kind == RUN and piece != "" and not piece.isspace())
+
+
+class _PageBuilder:
+    """State of a single :meth:`Paginator.paginate` pass."""
+
+    def __init__(self, paginator: "Paginator") -> None:
+        self.paginator = paginator
+        self.limit = paginator.limit
+        self.min_fill = paginator.limit // 2
+        self.pages: list[str] = []
+        self.pieces: list[str] = [""]
+        self.kinds: list[int] = [PREFIX]
+        self.used = 0
+        self.stack: Optional[_Open] = None
+        self.breaks: list[Optional[_Break]] = [None] * 4
+        self.has_content = False
+        self.sentence_end = False
+
+    @property
+    def has_pieces(self) -> bool:
+        """Whether anything, even whitespace or an opening tag, follows the reopening prefix."""
+        return len(self.pieces) > 1
+
+    def here(self) -> _Break:
+        return _Break(len(self.pieces), 0, self.used, self.stack)
+
+    def append(self, kind: int, raw: str, units: int) -> None:
+        self.pieces.append(raw)
+        self.kinds.append(kind)
+        self.used += units
+        if not self.has_content and _is_content(kind, raw):
+            self.has_content = True
+
+    def add_run(self, raw: str, units: int) -> None:
+        self.note_run_breaks(raw, len(raw))
+        self.append(RUN, raw, units)
+        self.sentence_end = (
+            not raw[-1].isspace() and raw.rstrip(_SENTENCE_TRAILERS)[-1:] in _SENTENCE_END
+        )
+
+    def note_run_breaks(self, raw: str, end: int) -> None:
+        """Records the last word and sentence breaks in ``raw[:end + 1]`` for
+        a run about to be appended; the whitespace they stop at is dropped."""
+        window = raw[:end + 1]
+        word = max(window.rfind(" "), window.rfind("\t"))
+        # a break inside leading whitespace would leave nothing on the page
+        if word < 0 or not (self.has_content or window[:word].strip()):
+            return
+        self.breaks[WORD] = self._inside(window, word)
+        match = _LAST_SENTENCE_END.match(window)
+        if match is not None:
+            self.breaks[SENTENCE] = self._inside(window, match.end())
+        elif self.sentence_end and self.has_content and window[0] in " \t":
+            self.breaks[SENTENCE] = self._inside(window, 0)
+
+    def _inside(self, window: str, offset: int) -> _Break:
+        return _Break(len(self.pieces), offset, self.used + utf16_length(window[:offset]), self.stack)
+
+    def best_break(self) -> Optional[_Break]:
+        for found in self.breaks:
+            if found is not None and found.used >= self.min_fill:
+                return found
+        return None
+
+    def cut(self, chosen: _Break) -> None:
+        head = self.pieces[:chosen.position]
+        head_kinds = self.kinds[:chosen.position]
+        tail = self.pieces[chosen.position:]
+        kinds = self.kinds[chosen.position:]
+        used = self.used - chosen.used
+        if chosen.offset:
+            head.append(tail[0][:chosen.offset])
+            head_kinds.append(kinds[0])
+            tail[0] = tail[0][chosen.offset:]
+        stack = chosen.stack
+        while tail:
+            if kinds[0] == CLOSE:
+                # a closing tag right after the break stays on this page
+                closing = tail.pop(0)
+                head_kinds.append(kinds.pop(0))
+                head.append(closing)
+                used -= self.paginator._toggle_units(closing)
+                stack = self.paginator._pop(stack, self.paginator._key(closing))
+            elif kinds[0] in (RUN, NEWLINE, BLANK_LINE) and not _preformatted(stack):
+                stripped = tail[0].lstrip()
+                used -= utf16_length(tail[0]) - utf16_length(stripped)
+                if stripped:
+                    tail[0] = stripped
+                    break
+                del tail[0], kinds[0]
+            else:
+                break
+        if any(map(_is_content, head_kinds, head)):
+            page_stack = stack
+            while head_kinds[-1] == OPEN or (
+                head_kinds[-1] in (RUN, NEWLINE, BLANK_LINE) and not _preformatted(page_stack) and not head[-1].strip()
+            ):
+                # an entity opened at the very end of the page, even before blank
+                # lines, is reopened on the next one
+                if head_kinds[-1] == OPEN:
+                    page_stack = page_stack.parent
+                head.pop()
+                head_kinds.pop()
+            page = "".join(head)
+            if not _preformatted(page_stack):
+                page = page.rstrip()
+            self.pages.append(page + self.paginator._closing(page_stack))
+        self.pieces = [self.paginator._reopening(stack), *tail]
+        self.kinds = [PREFIX, *kinds]
+        self.used = used + _reopen_units(stack)
+        self.breaks = [None] * 4
+        self.has_content = any(map(_is_content, kinds, tail))
+
+    def finish(self) -> list[str]:
+        if self.has_content:
+            page = "".join(self.pieces)
+            self.pages.append(page if _preformatted(self.stack) else page.rstrip())
+        return self.pages
+
+
+class Paginator:
+    def __init__(self, limit: int = TELEGRAM_MESSAGE_LIMIT, parse_mode: Optional[str] = None) -> None:
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        if parse_mode is not None and parse_mode not in PARSE_MODES:
+            raise ValueError(f"unsupported parse_mode {parse_mode!r}")
+        self.limit = limit
+        self.parse_mode = parse_mode
+
+    def paginate(self, text: str) -> list[str]:
+        builder = _PageBuilder(self)
+        for token in self._tokens(text):
+            self._feed(builder, token)
+        return builder.finish()
+
+    def _feed(self, builder: _PageBuilder, token: _Token) -> None:
+        kind, raw, units, key = token
+        verbatim = builder.stack is not None and builder.stack.key in _VERBATIM
+        if kind == TOGGLE:
+            closes = builder.stack is not None and builder.stack.key == key
+            if closes and raw != key:
+                # a closing fence matched with what looked like a language name
+                self._feed(builder, _Token(TOGGLE, key, self._toggle_units(key), key))
+                for rest in self._tokens(raw[len(key):]):
+                    self._feed(builder, rest)
+                return
+            kind = RUN if verbatim and not closes else CLOSE if closes else OPEN
+        elif kind == OPEN and verbatim:
+            kind = RUN
+        if kind == RUN:
+            self._feed_run(builder, raw)
+            return
+
+        stack = builder.stack
+        if kind == OPEN:
+            stack = self._push(stack, key, raw)
+        elif kind == CLOSE:
+            stack = self._pop(stack, key)
+            if len(builder.pieces) == 1:
+                # an entity reopened by the last cut ends before any content: drop both
+                builder.stack = stack
+                builder.pieces = [self._reopening(stack)]
+                builder.used = _reopen_units(stack)
+                return
+
+        while builder.used + units + _close_units(stack) > self.limit and builder.has_pieces:
+            if kind in (NEWLINE, BLANK_LINE):
+                here = builder.here()
+                builder.breaks[LINE if kind == NEWLINE else PARAGRAPH] = here
+                chosen = builder.best_break() or here
+                builder.cut(chosen)
+                if chosen is here:
+                    # the page ends at this line break, which is not carried over
+                    builder.sentence_end = False
+                    return
+            elif kind == ATOM and units + _reopen_units(builder.stack) + _close_units(builder.stack) > self.limit:
+                # longer than a page on its own, so it has to be split like text
+                self._feed_run(builder, raw)
+                return
+            else:
+                builder.cut(builder.best_break() or builder.here())
+        if kind in (NEWLINE, BLANK_LINE) and not builder.has_content and not _preformatted(stack):
+            return
+
+        builder.append(kind, raw, units)
+        builder.stack = stack
+        if kind == BLANK_LINE:
+            builder.breaks[PARAGRAPH] = builder.here()
+            builder.sentence_end = False
+        elif kind == NEWLINE:
+            builder.breaks[LINE] = builder.here()
+            builder.sentence_end = False
+        elif kind == ATOM:
+            builder.sentence_end = raw[-1] in _SENTENCE_END
+
+    def _feed_run(self, builder: _PageBuilder, raw: str) -> None:
+        if not builder.has_content and not _preformatted(builder.stack):
+            # whitespace that would open a page is dropped, as it is after a cut
+            raw = raw.lstrip()
+            if not raw:
+                return
+        units = utf16_length(raw)
+        if builder.used + units + _close_units(builder.stack) <= self.limit:
+            builder.add_run(raw, units)
+            return
+        start = 0
+        while start < len(raw):
+            available = self.limit - builder.used - _close_units(builder.stack)
+            window = raw[start:start + max(available, 0) + 1]
+            fit = fitting_prefix(window, available)
+            if start + fit == len(raw):
+                rest = raw[start:]
+                builder.add_run(rest, utf16_length(rest))
+                return
+            builder.note_run_breaks(window, fit)
+            chosen = builder.best_break()
+            if chosen is None:
+                if fit == 0 and builder.has_pieces:
+                    builder.cut(builder.here())
+                    continue
+                # no boundary to stop at: fill the page and cut between clusters
+                fit = fit or _cluster_end(raw, start) - start
+                chosen = builder._inside(window if fit < len(window) else raw[start:start + fit], fit)
+            elif chosen.position < len(builder.pieces):
+                builder.cut(chosen)
+                continue
+            piece = raw[start:start + chosen.offset]
+            builder.append(RUN, piece, utf16_length(piece))
+            builder.cut(chosen._replace(position=len(builder.pieces), offset=0, used=builder.used))
+            start += chosen.offset
+            if not _preformatted(builder.stack):
+                space = _LEADING_SPACE.match(raw, start)
+                if space is not None:
+                    start = space.end()
+            builder.sentence_end = False
+
+    def _tokens(self, text: str) -> Iterator[_Token]:
+        if self.parse_mode == "HTML":
+            pattern = _HTML_TOKENS
+        elif self.parse_mode == "MarkdownV2":
+            pattern = _MARKDOWN_V2_TOKENS
+        elif self.parse_mode == "Markdown":
+            pattern = _MARKDOWN_TOKENS
+        else:
+            pattern = _PLAIN_TOKENS
+        for match in pattern.finditer(text):
+            group, raw = match.lastgroup, match.group()
+            if group == "run":
+                yield _Token(RUN, raw, 0)
+            elif group == "newline":
+                yield _Token(NEWLINE, raw, len(raw))
+            elif group == "blank_line":
+                yield _Token(BLANK_LINE, raw, utf16_length(raw))
+            elif group == "tag":
+                yield _Token(CLOSE if raw.startswith("</") else OPEN, raw, 0, self._key(raw))
+            elif group == "entity":
+                yield _Token(ATOM, raw, utf16_length(unescape(raw)))
+            elif group in ("escape", "link"):
+                yield _Token(ATOM, raw, utf16_length(raw))
+            else:
+                yield _Token(TOGGLE, raw, self._toggle_units(raw), self._key(raw))
+
+    def _key(self, raw: str) -> str:
+        if self.parse_mode == "HTML":
+            return _HTML_TAG_NAME.match(raw).group(1).lower()
+        return "```" if raw.startswith("```") else raw
+
+    def _toggle_units(self, raw: str) -> int:
+        # HTML tags are not part of the message text, Markdown delimiters are
+        # counted as if they were, which only ever overestimates the length
+        return 0 if self.parse_mode == "HTML" else utf16_length(raw)
+
+    def _push(self, stack: Optional[_Open], key: str, opening: str) -> _Open:
+        if self.parse_mode == "HTML":
+            closing = f"</{key}>"
+        else:
+            closing = key
+        return _Open(
+            stack, key, opening, closing,
+            _close_units(stack) + self._toggle_units(closing),
+            _reopen_units(stack) + self._toggle_units(opening)
+        )
+
+    @staticmethod
+    def _pop(stack: Optional[_Open], key: str) -> Optional[_Open]:
+        node = stack
+        while node is not None and node.key != key:
+            node = node.parent
+        # an unmatched closing tag leaves the stack as it was
+        return node.parent if node is not None else stack
+
+    @staticmethod
+    def _reopening(stack: Optional[_Open]) -> str:
+        openings = []
+        while stack is not None:
+            openings.append(stack.opening)
+            stack = stack.parent
+        return "".join(reversed(openings))
+
+    @staticmethod
+    def _closing(stack: Optional[_Open]) -> str:
+        closings = []
+        while stack is not None:
+            closings.append(stack.closing)
+            stack = stack.parent
+        return "".join(closings)
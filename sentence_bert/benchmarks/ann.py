@@ -0,0 +1,84 @@
+"""Recall@1 and single-query latency of the IVF index against exact search.
+
+Vectors are drawn around random topic centres so that, like real answer
+embeddings, they have cluster structure; queries are noisy copies of
+knowledge base rows:
+
+    python -m sentence_bert.benchmarks.ann --sizes 10000 100000 300000 --nprobe 4 8 16
+"""
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from sentence_bert.src.domain.index import EmbeddingIndex, IvfIndex
+
+
+SIZES = (10_000, 100_000, 300_000)
+
+
+def make_vectors(size: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    topics = rng.standard_normal((max(size // 50, 1), dim), dtype=np.float32)
+    vectors = topics[rng.integers(len(topics), size=size)]
+    vectors += 1.5 * rng.standard_normal((size, dim), dtype=np.float32)
+    return vectors
+
+
+def latency(index: EmbeddingIndex, queries: np.ndarray) -> tuple[list[str], np.ndarray]:
+    keys, timings = [], []
+    for query in queries:
+        start = perf_counter()
+        keys.append(index.top_k(query, 1)[0][0])
+        timings.append(perf_counter() - start)
+    return keys, np.asarray(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--noise", type=float, default=3.0, help="query noise relative to row norm")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(
+        f"{'size':>8} {'index':>10} {'build s':>8} {'p50 ms':>8} {'p99 ms':>8} {'recall@1':>9}"
+    )
+    for size in args.sizes:
+        vectors = make_vectors(size, args.dim, rng)
+        exact = EmbeddingIndex.build(np.arange(size).astype(str), vectors)
+        rows = rng.integers(size, size=args.queries)
+        queries = exact.matrix[rows] + args.noise * rng.standard_normal(
+            (args.queries, args.dim), dtype=np.float32
+        ) / np.sqrt(args.dim)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        expected, timings = latency(exact, queries)
+        p50, p99 = np.percentile(timings, [50, 99])
+        print(f"{size:>8} {'exact':>10} {0:8.2f} {p50:8.2f} {p99:8.2f} {1:9.3f}")
+
+        start = perf_counter()
+        ivf = IvfIndex.from_index(exact, args.nlist, args.nprobe[0], args.iterations)
+        build_time = perf_counter() - start
+        for nprobe in args.nprobe:
+            found, timings = latency(ivf.with_nprobe(nprobe), queries)
+            recall = np.mean([a == b for a, b in zip(found, expected)])
+            p50, p99 = np.percentile(timings, [50, 99])
+            label = f"ivf/{nprobe}"
+            print(f"{size:>8} {label:>10} {build_time:8.2f} {p50:8.2f} {p99:8.2f} {recall:9.3f}")
+
+        start = perf_counter()
+        grown = EmbeddingIndex.build(
+            np.concatenate([exact.keys, np.arange(size, size + size // 10).astype(str)]),
+            np.concatenate([exact.matrix, make_vectors(size // 10, args.dim, rng)])
+        )
+        IvfIndex.from_index(grown, args.nlist, args.nprobe[0], args.iterations, previous=ivf)
+        print(f"{size:>8} {'+10% incr':>10} {perf_counter() - start:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Parity, latency and RSS of the torch / int8 / onnx encoder backends.
+
+Every backend runs in a fresh spawned process so peak RSS is not shared
+between them. Embeddings and top-1 answers are compared against eager torch:
+
+    python -m sentence_bert.benchmarks.backends --model cointegrated/rut5-base --csv knowledge_base.csv
+"""
+import argparse
+import csv
+import multiprocessing
+import random
+import resource
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import Optional
+
+import numpy as np
+
+from sentence_bert.src.config import BertConfig
+from sentence_bert.src.domain.index import EmbeddingIndex
+
+
+BACKENDS = ("torch", "int8", "onnx")
+
+
+def load_documents(csv_path: Optional[str], size: int) -> list[str]:
+    if csv_path:
+        with open(csv_path, encoding="utf-8", newline="") as file:
+            rows = csv.reader(file, delimiter="~")
+            return [row[1].strip() for row in rows if len(row) == 2][:size]
+    rng = random.Random(0)
+    words = [f"word{i}" for i in range(2000)]
+    return [" ".join(rng.choices(words, k=rng.randint(8, 120))) for _ in range(size)]
+
+
+def make_queries(documents: list[str], size: int) -> list[str]:
+    rng = random.Random(1)
+    queries = []
+    for document in rng.choices(documents, k=size):
+        words = document.split()
+        start = rng.randrange(max(len(words) - 8, 1))
+        queries.append(" ".join(words[start:start + 8]))
+    return queries
+
+
+def run_backend(
+    config: BertConfig,
+    documents: list[str],
+    queries: list[str]
+) -> tuple[np.ndarray, np.ndarray, list[float], float, float]:
+    from transformers import AutoTokenizer, T5EncoderModel
+
+    from sentence_bert.src.infrastructure.backends import load_encoder
+    from sentence_bert.src.infrastructure.inference import encode_texts
+
+    start = perf_counter()
+    model = T5EncoderModel.from_pretrained(config.model_name).eval()
+    tokenizer = AutoTokenizer.from_pretrained(config.model_name, use_fast=True)
+    encoder = load_encoder(config, model)
+    del model
+    load_time = perf_counter() - start
+    document_embeddings = encode_texts(
+        encoder, tokenizer, documents, config.encode_batch_size, config.document_max_length
+    )
+    latencies = []
+    query_embeddings = []
+    for query in queries:
+        start = perf_counter()
+        query_embeddings.append(
+            encode_texts(encoder, tokenizer, [query], 1, config.query_max_length)[0]
+        )
+        latencies.append(perf_counter() - start)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return document_embeddings, np.stack(query_embeddings), latencies, load_time, peak_rss
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--csv", default=None, help="~-delimited knowledge base; synthetic text otherwise")
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--onnx-path", default=None)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    args = parser.parse_args()
+
+    documents = load_documents(args.csv, args.documents)
+    queries = make_queries(documents, args.queries)
+    onnx_path = args.onnx_path or str(Path(tempfile.gettempdir()) / "sentence_bert_benchmark.onnx")
+    backends = ["torch", *[backend for backend in args.backends if backend != "torch"]]
+    context = multiprocessing.get_context("spawn")
+    reference: Optional[tuple[np.ndarray, np.ndarray, EmbeddingIndex]] = None
+
+    print(f"{len(documents)} documents, {len(queries)} queries")
+    print(
+        f"{'backend':>8} {'load s':>8} {'p50 ms':>8} {'p99 ms':>8} {'peak MB':>8}"
+        f" {'min cos':>8} {'top-1 %':>8}"
+    )
+    for backend in backends:
+        config = BertConfig(
+            BERT_BASE_PATH="knowledge_base.csv",
+            BERT_MODEL_NAME=args.model,
+            BERT_THRESHOLD=0.0,
+            BERT_QUERY_INSTRUCTION="",
+            BERT_DOCUMENT_INSTRUCTION="",
+            BERT_INFERENCE_THREADS=args.threads,
+            BERT_ENCODER_BACKEND=backend,
+            BERT_ONNX_PATH=onnx_path,
+        )
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            documents_embeddings, query_embeddings, latencies, load_time, peak_rss = pool.submit(
+                run_backend, config, documents, queries
+            ).result()
+        index = EmbeddingIndex.build(np.arange(len(documents)).astype(str), documents_embeddings)
+        if reference is None:
+            reference = (documents_embeddings, query_embeddings, index)
+        reference_documents, reference_queries, reference_index = reference
+        min_cosine = min(
+            float((documents_embeddings * reference_documents).sum(axis=1).min()),
+            float((query_embeddings * reference_queries).sum(axis=1).min()),
+        )
+        top_1 = [hits[0][0] for hits in index.top_k_batch(query_embeddings, 1)]
+        reference_top_1 = [hits[0][0] for hits in reference_index.top_k_batch(reference_queries, 1)]
+        agreement = 100 * np.mean([a == b for a, b in zip(top_1, reference_top_1)])
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(
+            f"{backend:>8} {load_time:8.2f} {p50:8.2f} {p99:8.2f} {peak_rss:8.0f}"
+            f" {min_cosine:8.4f} {agreement:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
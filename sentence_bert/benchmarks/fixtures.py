@@ -0,0 +1,70 @@
+"""Offline stand-ins shared by the benchmarks: a tiny randomly initialised T5
+encoder, a word-level fast tokenizer and a synthetic ``~``-delimited KB."""
+import random
+from pathlib import Path
+
+import numpy as np
+from tokenizers import Tokenizer, models, pre_tokenizers, trainers
+from transformers import PreTrainedTokenizerFast, T5Config, T5EncoderModel
+
+
+VOCABULARY = [f"word{i}" for i in range(4000)]
+SPECIAL_TOKENS = ["<pad>", "</s>", "<unk>"]
+
+
+def tiny_tokenizer() -> PreTrainedTokenizerFast:
+    tokenizer = Tokenizer(models.WordLevel(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.train_from_iterator(
+        [" ".join(VOCABULARY)],
+        trainers.WordLevelTrainer(special_tokens=SPECIAL_TOKENS)
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        pad_token="<pad>",
+        eos_token="</s>",
+        unk_token="<unk>",
+        model_max_length=512
+    )
+
+
+def tiny_model(d_model: int = 64, num_layers: int = 2, seed: int = 0) -> T5EncoderModel:
+    import torch
+
+    torch.manual_seed(seed)
+    config = T5Config(
+        vocab_size=len(VOCABULARY) + len(SPECIAL_TOKENS),
+        d_model=d_model,
+        d_kv=d_model // 4,
+        d_ff=d_model * 4,
+        num_layers=num_layers,
+        num_heads=4
+    )
+    return T5EncoderModel(config).eval()
+
+
+def save_tiny_checkpoint(path: Path) -> Path:
+    """Writes model and tokenizer so code paths that call from_pretrained work offline."""
+    tiny_model().save_pretrained(path)
+    tiny_tokenizer().save_pretrained(path)
+    return path
+
+
+def synthetic_texts(size: int, min_words: int, max_words: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choices(VOCABULARY, k=rng.randint(min_words, max_words)))
+        for _ in range(size)
+    ]
+
+
+def write_knowledge_base(path: Path, size: int, seed: int = 0) -> Path:
+    with open(path, "w", encoding="utf-8") as file:
+        for i, answer in enumerate(synthetic_texts(size, 20, 200, seed)):
+            file.write(f"{i}~{answer}\n")
+    return path
+
+
+def random_vectors(size: int, dim: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((size, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
@@ -0,0 +1,78 @@
+"""Throughput of answer pagination on megabyte-sized answers.
+
+Answers mix Latin, Cyrillic and emoji text with paragraphs, lines and, for
+each parse mode, its own bold/code markup:
+
+    python -m sentence_bert.benchmarks.pagination --sizes 1 2 4
+"""
+import argparse
+from time import perf_counter
+from typing import Any, Optional
+
+from common.pagination import PARSE_MODES, TELEGRAM_MESSAGE_LIMIT, Paginator, utf16_length
+
+
+SIZES_MB = (1, 2, 4)
+
+SENTENCES = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit.",
+    "Проверьте настройки подключения и повторите попытку!",
+    "Is the service available from your network?",
+    "Готово 👍🏽 — ответ сохранён 🇷🇺.",
+)
+MARKUP = {
+    None: ("{}", "{}"),
+    "HTML": ("<b>{}</b>", "<code>{}</code>"),
+    "Markdown": ("*{}*", "`{}`"),
+    "MarkdownV2": ("*{}*", "`{}`"),
+}
+
+
+def make_answer(size_mb: int, parse_mode: Optional[str]) -> str:
+    bold, code = MARKUP[parse_mode]
+    paragraph = " ".join(
+        bold.format(sentence) if i % 3 == 0 else code.format("retry()") + " " + sentence
+        for i, sentence in enumerate(SENTENCES * 8)
+    )
+    if parse_mode == "MarkdownV2":
+        paragraph = paragraph.replace(".", "\\.").replace("!", "\\!").replace("(", "\\(").replace(")", "\\)")
+    block = paragraph + "\n" + paragraph + "\n\n"
+    return block * max(1, size_mb * 2**20 // len(block.encode()))
+
+
+def measure(sizes_mb: list[int], limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[dict[str, Any]]:
+    results = []
+    for parse_mode in (None, *PARSE_MODES):
+        paginator = Paginator(limit, parse_mode)
+        for size_mb in sizes_mb:
+            answer = make_answer(size_mb, parse_mode)
+            started = perf_counter()
+            pages = paginator.paginate(answer)
+            elapsed = perf_counter() - started
+            assert all(utf16_length(page) <= limit for page in pages)
+            megabytes = len(answer.encode()) / 2**20
+            results.append({
+                "parse_mode": parse_mode or "plain",
+                "megabytes": megabytes,
+                "pages": len(pages),
+                "seconds": elapsed,
+                "mb_per_second": megabytes / elapsed,
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES_MB)
+    parser.add_argument("--limit", type=int, default=TELEGRAM_MESSAGE_LIMIT)
+    args = parser.parse_args()
+    print(f"{'parse mode':>11} {'MB':>6} {'pages':>7} {'time, s':>8} {'MB/s':>7}")
+    for result in measure(args.sizes, args.limit):
+        print(
+            f"{result['parse_mode']:>11} {result['megabytes']:>6.2f} {result['pages']:>7}"
+            f" {result['seconds']:>8.3f} {result['mb_per_second']:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
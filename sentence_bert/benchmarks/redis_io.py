@@ -0,0 +1,102 @@
+"""Wall time of KB save/load through Redis at 1k, 10k and 100k answers.
+
+Runs against an in-process fakeredis server by default; pass --url to
+measure a real local Redis instead:
+
+    python -m sentence_bert.benchmarks.redis_io --url redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+from time import perf_counter
+from uuid import uuid4
+
+import torch
+from redis.asyncio import Redis
+
+from sentence_bert.src.config import BertConfig, RedisConfig
+from sentence_bert.src.domain.entities import AnswersDataDm
+from sentence_bert.src.infrastructure.gateways import (
+    EmbeddingsSnapshotGateway,
+    KnowledgeBasePrepareGateway
+)
+from sentence_bert.src.infrastructure.index_file import IndexFileGateway
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+
+
+SIZES = (1_000, 10_000, 100_000)
+
+BERT_CONFIG = BertConfig(
+    BERT_BASE_PATH="knowledge_base.csv",
+    BERT_MODEL_NAME="",
+    BERT_THRESHOLD=0.0,
+    BERT_QUERY_INSTRUCTION="",
+    BERT_DOCUMENT_INSTRUCTION="",
+)
+
+
+def make_redis(url: str | None) -> Redis:
+    if url:
+        return Redis.from_url(url)
+    from fakeredis import FakeAsyncRedis
+    return FakeAsyncRedis()
+
+
+def make_knowledge_base(size: int, dim: int) -> AnswersDataDm:
+    uuids = [str(uuid4()) for _ in range(size)]
+    vectors = torch.nn.functional.normalize(torch.randn(size, dim), dim=1)
+    return AnswersDataDm(
+        answers={uuid: [f"answer {i}"] for i, uuid in enumerate(uuids)},
+        answers_embendings=dict(zip(uuids, vectors))
+    )
+
+
+async def measure(
+    redis: Redis,
+    size: int,
+    dim: int,
+    chunk_size: int,
+    dtype: str
+) -> tuple[float, float, int]:
+    redis_config = RedisConfig(
+        REDIS_HOST="", REDIS_PORT=0, REDIS_PASSWORD="", REDIS_DB=0, REDIS_CHUNK_SIZE=chunk_size
+    )
+    bert_config = BERT_CONFIG.model_copy(update={"embedding_dtype": dtype})
+    saver = KnowledgeBasePrepareGateway(redis, bert_config, redis_config, MetricsRegistry())
+    loader = EmbeddingsSnapshotGateway(
+        redis, bert_config, redis_config, IndexFileGateway(bert_config), MetricsRegistry()
+    )
+    knowledge_base = make_knowledge_base(size, dim)
+    await redis.flushdb()
+    started = perf_counter()
+    version = await saver.next_version()
+    await saver.save_answers(knowledge_base, version)
+    await saver.commit_version(version, removed=set())
+    saved = perf_counter()
+    encoded = await loader.get_all_embeddings_scan()
+    loaded = perf_counter()
+    assert encoded is not None and len(encoded.index) == size
+    value_size = await redis.strlen(f"embedding:{encoded.index.keys[0]}")
+    return saved - started, loaded - saved, value_size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--dtype", choices=("float32", "float16"), default="float32")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args()
+    redis = make_redis(args.url)
+    print(f"{'keys':>8} {'save, s':>9} {'load, s':>9} {'bytes/vec':>10}")
+    for size in args.sizes:
+        save_time, load_time, value_size = await measure(
+            redis, size, args.dim, args.chunk_size, args.dtype
+        )
+        print(f"{size:>8} {save_time:>9.3f} {load_time:>9.3f} {value_size:>10}")
+    await redis.flushdb()
+    await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,275 @@
+"""Offline benchmark suite for the retrieval pipeline.
+
+Uses a tiny randomly initialised T5 encoder, a synthetic ``~``-delimited
+knowledge base, fakeredis and FastStream's TestRabbitBroker, so it needs no
+network, model download, Redis or RabbitMQ. Results go to a JSON file that
+can be diffed between commits:
+
+    python -m sentence_bert.benchmarks.suite --output bench-$(git rev-parse --short HEAD).json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Optional
+
+import numpy as np
+import torch
+from dishka import Provider, Scope, make_async_container, provide
+from dishka.integrations import faststream as faststream_integration
+from faststream import FastStream
+from faststream.rabbit import RabbitBroker, RabbitExchange, RabbitMessage, TestRabbitBroker
+from redis.asyncio import Redis
+from transformers import PreTrainedTokenizerBase, T5EncoderModel
+
+from sentence_bert.benchmarks import pagination, redis_io
+from sentence_bert.benchmarks.fixtures import (
+    random_vectors,
+    synthetic_texts,
+    tiny_model,
+    tiny_tokenizer,
+    write_knowledge_base
+)
+from sentence_bert.src.application.interactors import PrepareKnowledgeBaseInteractor
+from sentence_bert.src.config import BertConfig, Config, RabbitMQConfig, RedisConfig
+from sentence_bert.src.controllers.ampq import TasksController
+from sentence_bert.src.domain.entities import ProcessQueryDm
+from sentence_bert.src.domain.index import EmbeddingIndex
+from sentence_bert.src.infrastructure.cache import QueryEmbeddingCache, SemanticAnswerCache
+from sentence_bert.src.infrastructure.gateways import (
+    KnowledgeBaseGateway,
+    KnowledgeBasePrepareGateway
+)
+from sentence_bert.src.infrastructure.inference import InferenceExecutor
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+from sentence_bert.src.infrastructure.publisher import BatchingPublisher
+from sentence_bert.src.ioc import AppProvider, PreloadedModelProvider
+
+
+SECTIONS = ("encode", "process_query", "redis", "end_to_end", "pagination")
+
+
+class OfflineProvider(Provider):
+    def __init__(self, redis: Redis) -> None:
+        super().__init__()
+        self._redis = redis
+
+    @provide(scope=Scope.APP)
+    def get_redis(self) -> Redis:
+        return self._redis
+
+
+def make_config(workdir: Path, knowledge_base: Path) -> Config:
+    return Config(
+        redis=RedisConfig(REDIS_HOST="", REDIS_PORT=0, REDIS_PASSWORD="", REDIS_DB=0),
+        bert=BertConfig(
+            BERT_BASE_PATH=str(knowledge_base),
+            BERT_MODEL_NAME="tiny-t5",
+            BERT_THRESHOLD=0.5,
+            BERT_QUERY_INSTRUCTION="word1",
+            BERT_DOCUMENT_INSTRUCTION="word2",
+            BERT_INDEX_PATH=str(workdir / "knowledge_base.index"),
+        ),
+        rabbitmq=RabbitMQConfig(
+            RABBITMQ_HOST="",
+            RABBITMQ_PORT=0,
+            RABBITMQ_USER="",
+            RABBITMQ_PASSWORD="",
+            RABBITMQ_VHOST="/"
+        ),
+    )
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    values = np.asarray(samples) * 1000
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "mean_ms": float(values.mean())}
+
+
+def make_gateway(
+    config: BertConfig,
+    rabbitmq_config: RabbitMQConfig,
+    executor: InferenceExecutor,
+    redis: Redis
+) -> KnowledgeBaseGateway:
+    return KnowledgeBaseGateway(
+        executor,
+        QueryEmbeddingCache(redis, config, MetricsRegistry()),
+        SemanticAnswerCache(config, MetricsRegistry()),
+        config,
+        BatchingPublisher(RabbitBroker(), rabbitmq_config),
+        MetricsRegistry()
+    )
+
+
+async def bench_encode(config: Config, executor: InferenceExecutor, redis: Redis) -> dict[str, Any]:
+    loader = KnowledgeBasePrepareGateway(redis, config.bert, config.redis, MetricsRegistry())
+    batches = [batch async for batch in loader.stream_csv()]
+    gateway = make_gateway(config.bert, config.rabbitmq, executor, redis)
+    await gateway.encode_knowledge_base(batches[0])
+    started = perf_counter()
+    for batch in batches:
+        await gateway.encode_knowledge_base(batch)
+    elapsed = perf_counter() - started
+    answers = sum(len(batch.answers) for batch in batches)
+    return {"answers": answers, "seconds": elapsed, "answers_per_second": answers / elapsed}
+
+
+async def bench_process_query(
+    config: Config,
+    executor: InferenceExecutor,
+    redis: Redis,
+    sizes: list[int],
+    queries: int,
+    dim: int
+) -> list[dict[str, Any]]:
+    bert_config = config.bert.model_copy(update={"semantic_cache_size": 0})
+    results = []
+    for size in sizes:
+        index = EmbeddingIndex.build(
+            [f"answer-{i}" for i in range(size)], random_vectors(size, dim, seed=size)
+        )
+        gateway = make_gateway(bert_config, config.rabbitmq, executor, redis)
+        samples = []
+        for query in synthetic_texts(queries + 1, 3, 20, seed=size):
+            started = perf_counter()
+            await gateway.process_query(ProcessQueryDm(query, index, knowledge_base_version=1))
+            samples.append(perf_counter() - started)
+        results.append({"knowledge_base_size": size, "queries": queries, **percentiles(samples[1:])})
+    return results
+
+
+async def bench_redis(sizes: list[int], dim: int, chunk_size: int) -> list[dict[str, Any]]:
+    redis = redis_io.make_redis(None)
+    results = []
+    for size in sizes:
+        save, load, value_size = await redis_io.measure(redis, size, dim, chunk_size, "float32")
+        results.append({
+            "keys": size,
+            "save_seconds": save,
+            "load_seconds": load,
+            "bytes_per_vector": value_size,
+        })
+    await redis.aclose()
+    return results
+
+
+async def bench_end_to_end(
+    config: Config,
+    model: T5EncoderModel,
+    tokenizer: PreTrainedTokenizerBase,
+    questions: int
+) -> dict[str, Any]:
+    redis = redis_io.make_redis(None)
+    broker = RabbitBroker(logger=None)
+    container = make_async_container(
+        AppProvider(),
+        PreloadedModelProvider(model, tokenizer),
+        OfflineProvider(redis),
+        context={Config: config, RabbitBroker: broker}
+    )
+    app = FastStream(broker)
+    faststream_integration.setup_dishka(container, app, auto_inject=True)
+    broker.include_router(TasksController)
+    answered: list[str] = []
+
+    @broker.subscriber("send_answer", exchange=RabbitExchange("custom_model"))
+    async def collect(message: RabbitMessage) -> None:
+        answered.append(message.correlation_id)
+
+    async with TestRabbitBroker(broker):
+        started = perf_counter()
+        async with container() as request:
+            await (await request.get(PrepareKnowledgeBaseInteractor))()
+        build_time = perf_counter() - started
+        samples = []
+        for i, question in enumerate(synthetic_texts(questions + 1, 3, 20, seed=7)):
+            started = perf_counter()
+            await broker.publish(
+                {"user_id": 1, "question": question},
+                "question_handler",
+                correlation_id=str(i)
+            )
+            samples.append(perf_counter() - started)
+    await container.close()
+    await redis.aclose()
+    assert len(answered) == questions + 1, "not every question was answered"
+    return {"questions": questions, "build_seconds": build_time, **percentiles(samples[1:])}
+
+
+def metadata(args: argparse.Namespace) -> dict[str, Any]:
+    try:
+        commit: Optional[str] = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "numpy": np.__version__,
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    results: dict[str, Any] = {"metadata": metadata(args)}
+    model = tiny_model(d_model=args.d_model)
+    tokenizer = tiny_tokenizer()
+    with tempfile.TemporaryDirectory() as workdir:
+        knowledge_base = write_knowledge_base(Path(workdir) / "knowledge_base.csv", args.kb_size)
+        config = make_config(Path(workdir), knowledge_base)
+        redis = redis_io.make_redis(None)
+        executor = InferenceExecutor(config.bert, model, tokenizer, MetricsRegistry())
+        try:
+            if "encode" in args.sections:
+                results["encode"] = await bench_encode(config, executor, redis)
+            if "process_query" in args.sections:
+                results["process_query"] = await bench_process_query(
+                    config, executor, redis, args.query_sizes, args.queries, args.d_model
+                )
+        finally:
+            executor.shutdown()
+            await redis.aclose()
+        if "redis" in args.sections:
+            results["redis"] = await bench_redis(args.redis_sizes, args.d_model, args.chunk_size)
+        if "end_to_end" in args.sections:
+            results["end_to_end"] = await bench_end_to_end(config, model, tokenizer, args.questions)
+    if "pagination" in args.sections:
+        results["pagination"] = pagination.measure(args.pagination_sizes)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--d-model", type=int, default=64)
+    parser.add_argument("--kb-size", type=int, default=2000)
+    parser.add_argument("--query-sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--redis-sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--pagination-sizes", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    Path(args.output).write_text(json.dumps(results, indent=2, default=float))
+    summary = {key: value for key, value in results.items() if key != "metadata"}
+    print(json.dumps(summary, indent=2, default=float))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Throughput and memory of the pre-fork pool as the worker count grows.
+
+The parent loads the model exactly as the supervisor does, forks N children
+that encode queries for a fixed time with pinned torch threads, and sums
+their RSS and PSS (proportional set size, which splits copy-on-write pages
+between the processes that share them):
+
+    python -m sentence_bert.benchmarks.worker_pool --model cointegrated/rut5-base --workers 1 2 4
+"""
+import argparse
+import os
+import random
+import time
+
+import torch
+
+from sentence_bert.src.config import BertConfig
+from sentence_bert.src.infrastructure.backends import load_encoder
+from sentence_bert.src.infrastructure.inference import encode_texts
+from sentence_bert.src.supervisor import load_shared_model
+
+
+def memory_kb(pid: int) -> tuple[int, int]:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as file:
+        for line in file:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name] = int(rest.split()[0])
+    return values["Rss"], values["Pss"]
+
+
+def run_child(config: BertConfig, model, tokenizer, duration: float, pipe: int) -> None:
+    torch.set_num_threads(config.inference_threads)
+    encoder = load_encoder(config, model)
+    rng = random.Random(os.getpid())
+    words = [f"word{i}" for i in range(2000)]
+    queries = [" ".join(rng.choices(words, k=rng.randint(4, 16))) for _ in range(256)]
+    encode_texts(encoder, tokenizer, queries[:1], 1, config.query_max_length)
+    done = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        encode_texts(encoder, tokenizer, [queries[done % len(queries)]], 1, config.query_max_length)
+        done += 1
+    os.write(pipe, f"{done}\n".encode())
+    time.sleep(1.0)
+
+
+def measure(config: BertConfig, model, tokenizer, workers: int, duration: float) -> tuple[float, int, int]:
+    read_end, write_end = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            try:
+                run_child(config, model, tokenizer, duration, write_end)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    os.close(write_end)
+    with os.fdopen(read_end) as reader:
+        counts = [int(reader.readline()) for _ in pids]
+        memory = [memory_kb(pid) for pid in pids]
+    for pid in pids:
+        os.waitpid(pid, 0)
+    return sum(counts) / duration, sum(rss for rss, _ in memory), sum(pss for _, pss in memory)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--backend", choices=("torch", "int8", "onnx"), default="torch")
+    args = parser.parse_args()
+
+    config = BertConfig(
+        BERT_BASE_PATH="knowledge_base.csv",
+        BERT_MODEL_NAME=args.model,
+        BERT_THRESHOLD=0.0,
+        BERT_QUERY_INSTRUCTION="",
+        BERT_DOCUMENT_INSTRUCTION="",
+        BERT_INFERENCE_THREADS=args.threads,
+        BERT_ENCODER_BACKEND=args.backend,
+    )
+    model, tokenizer = load_shared_model(config)
+    parent_rss, _ = memory_kb(os.getpid())
+    print(f"parent RSS {parent_rss / 1024:.0f} MB, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'queries/s':>10} {'speedup':>8} {'RSS MB':>8} {'PSS MB':>8}")
+    baseline = None
+    for workers in args.workers:
+        throughput, rss, pss = measure(config, model, tokenizer, workers, args.duration)
+        baseline = baseline or throughput
+        print(
+            f"{workers:>8} {throughput:10.1f} {throughput / baseline:8.2f}"
+            f" {rss / 1024:8.0f} {pss / 1024:8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,32 @@
+import asyncio
 from typing import Optional
+
 from sentence_bert.src.application.dto import QuestionHandlerDto
 from sentence_bert.src.application.interfaces import (
     AnswerPaginator,
     CacheEmbendingsGetter,
+    EmbeddingsSnapshot,
     KnowledgeBaseService,
     LoadKnowledgeBase, 
-    EmbendingNormalization,
     EmbendingEncoder,
+    IndexFileStorage,
+    KnowledgeBaseBuildLock,
     SaveAnswersCache,
     CreateAnswersDict,
     ResultSender,
 )
 from sentence_bert.src.domain.entities import (
+    AnswerBaseDataDm,
     AnswerDm,
-    AnswersDataDm, 
+    AnswersDataDm,
     AnswersGetUuidDm, 
-    EncodedAnswersDm,
     ProcessQueryDm
 )
 
+
+PIPELINE_DEPTH = 2
+
+
 class PrepareKnowledgeBaseInteractor:
     def __init__(
         self,
@@ -27,57 +35,121 @@ class PrepareKnowledgeBaseInteractor:
         encoder_gateway: EmbendingEncoder,
         enum_gateway: CreateAnswersDict,
         cache: SaveAnswersCache,
+        embeddings_getter: CacheEmbendingsGetter,
+        index_file: IndexFileStorage,
+        build_lock: KnowledgeBaseBuildLock,
     ) -> None:
         self._paginator = paginator
         self._base_loader = base_loader
         self._encoder_gateway = encoder_gateway
         self._enum_gateway = enum_gateway
         self._cache = cache
+        self._embeddings_getter = embeddings_getter
+        self._index_file = index_file
+        self._build_lock = build_lock
 
     async def __call__(self) -> None:
-        knowledge_base = self._base_loader.from_csv()
-        answers_chunks = []
-        for answer in knowledge_base:
-            answers_chunks.append(await self._paginator.paginate_answer(answer))
-        encoded_knowledge_base = self._encoder_gateway.encode_knowledge_base(knowledge_base)
-        enum_dm_base = self._enum_gateway.create_answers_data(
-            AnswersGetUuidDm(
-                chunks=answers_chunks,
-                embendings=encoded_knowledge_base
+        await self._build_lock.run_once(self._build)
+
+    async def _build(self) -> None:
+        committed = await self._embeddings_getter.get_knowledge_base_version()
+        stored = await self._cache.get_answers_versions()
+        existing = set(stored)
+        version = await self._cache.next_version()
+        seen: set[str] = set()
+        rows: asyncio.Queue[Optional[dict[str, str]]] = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+        encoded: asyncio.Queue[Optional[AnswersDataDm]] = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+        async with asyncio.TaskGroup() as group:
+            group.create_task(self._read(existing, seen, rows))
+            group.create_task(self._encode(rows, encoded))
+            written = group.create_task(self._write(encoded, version))
+        removed = existing - seen
+        # rows left by a build that stopped before its commit still need one
+        uncommitted = committed is None or any(stamp > committed for stamp in stored.values())
+        if not written.result() and not removed and not uncommitted:
+            return
+        await self._build_lock.ensure_held()
+        await self._cache.commit_version(version, removed)
+        encoded_answers = await self._embeddings_getter.get_all_embeddings_scan()
+        if encoded_answers is not None:
+            self._index_file.save_index_file(encoded_answers)
+
+    async def _read(
+        self,
+        existing: set[str],
+        seen: set[str],
+        output: asyncio.Queue[Optional[dict[str, str]]]
+    ) -> None:
+        async for knowledge_base in self._base_loader.stream_csv():
+            rows = {}
+            uuids = self._enum_gateway.create_answers_ids(knowledge_base)
+            for uuid, answer in zip(uuids, knowledge_base.answers):
+                if uuid not in seen and uuid not in existing:
+                    rows[uuid] = answer
+                seen.add(uuid)
+            if rows:
+                await output.put(rows)
+        await output.put(None)
+
+    async def _encode(
+        self,
+        rows_queue: asyncio.Queue[Optional[dict[str, str]]],
+        output: asyncio.Queue[Optional[AnswersDataDm]]
+    ) -> None:
+        while (rows := await rows_queue.get()) is not None:
+            knowledge_base = AnswerBaseDataDm(answers=list(rows.values()))
+            answers_chunks = []
+            for answer in knowledge_base.answers:
+                answers_chunks.append((await self._paginator.paginate_answer(answer)).chunks)
+            encoded_knowledge_base = await self._encoder_gateway.encode_knowledge_base(knowledge_base)
+            await output.put(
+                self._enum_gateway.create_answers_data(
+                    AnswersGetUuidDm(
+                        uuids=list(rows),
+                        chunks=answers_chunks,
+                        embendings=encoded_knowledge_base
+                    )
+                )
             )
-        )
-        await self._cache.save_answers(enum_dm_base)
+        await output.put(None)
+
+    async def _write(
+        self,
+        encoded: asyncio.Queue[Optional[AnswersDataDm]],
+        version: int
+    ) -> bool:
+        written = False
+        while (answers := await encoded.get()) is not None:
+            await self._cache.save_answers(answers, version)
+            written = True
+        return written
 
 class QuestionsHandlerInteractor:
     def __init__(
         self,
-        emb_getter_gateway: CacheEmbendingsGetter,
+        snapshot_gateway: EmbeddingsSnapshot,
         answer_gateway: KnowledgeBaseService,
-        normalization_gateway: EmbendingNormalization,
         sender_gateway: ResultSender,
-        knowledge_base_embendings: EncodedAnswersDm
     ) -> None:
-        self._emb_getter_gateway = emb_getter_gateway
+        self._snapshot_gateway = snapshot_gateway
         self._answer_gateway = answer_gateway
-        self._normalization_gateway = normalization_gateway
         self._sender_gateway = sender_gateway
-        self._base = knowledge_base_embendings
 
     async def __call__(self, dto: QuestionHandlerDto) -> Optional[bool]:
-        embendigs = await self._emb_getter_gateway.get_all_embeddings_scan()
+        embendigs = await self._snapshot_gateway.get_snapshot()
         if not embendigs:
             return None
-        answer = await self._answer_gateway.process_query(
+        result = await self._answer_gateway.process_query(
             params=ProcessQueryDm(
                 query=dto.question, 
-                knowledge_base_embeddings=self._base, 
-                normalization=self._normalization_gateway.l2_normalization
+                knowledge_base_embeddings=embendigs.index,
+                knowledge_base_version=embendigs.version
             )
         )
         await self._sender_gateway.send_answer(
             AnswerDm(
                 user_id=dto.user_id,
-                answer=answer,
+                result=result,
                 correlation_id=dto.correlation_id
             )
         )
@@ -1,21 +1,30 @@
-from typing import Optional, Protocol
+from typing import AsyncIterator, Awaitable, Callable, Optional, Protocol
 from abc import abstractmethod
-from uuid import UUID
 
+import numpy as np
 from torch import Tensor
 
 from sentence_bert.src.domain.entities import (
     AnswerBaseDataDm,
+    AnswerDm,
     AnswersChunksDm,
     AnswersDataDm,
+    AnswersGetUuidDm,
     EncodedAnswersDm,
-    ProcessQueryDm
+    ProcessQueriesDm,
+    ProcessQueryDm,
+    QueryResultDm
 )
 
 
 class KnowledgeBaseService(Protocol):
     @abstractmethod
-    async def process_query(self, params: ProcessQueryDm) -> str: ...
+    async def process_query(self, params: ProcessQueryDm) -> QueryResultDm: ...
+
+
+class BatchKnowledgeBaseService(Protocol):
+    @abstractmethod
+    async def process_queries(self, params: ProcessQueriesDm) -> list[QueryResultDm]: ...
 
 
 class EmbendingNormalization(Protocol):
@@ -25,17 +34,41 @@ class EmbendingNormalization(Protocol):
 
 class EmbendingEncoder(Protocol):
     @abstractmethod
-    def encode_knowledge_base(self, knowledge_base: AnswersDataDm) -> EncodedAnswersDm: ...
+    async def encode_knowledge_base(self, knowledge_base: AnswerBaseDataDm) -> np.ndarray: ...
+
+
+class QueryEmbeddingsCache(Protocol):
+    @abstractmethod
+    async def get_many(self, queries: list[str]) -> list[Optional[np.ndarray]]: ...
+
+    @abstractmethod
+    async def set_many(self, queries: list[str], embeddings: np.ndarray) -> None: ...
+
+
+class SemanticAnswersCache(Protocol):
+    @abstractmethod
+    def lookup(self, embeddings: np.ndarray, version: int) -> list[Optional[QueryResultDm]]: ...
+
+    @abstractmethod
+    def store(self, embeddings: np.ndarray, results: list[QueryResultDm], version: int) -> None: ...
 
 
 class CacheEmbendingsGetter(Protocol):
+    @abstractmethod
+    async def get_knowledge_base_version(self) -> Optional[int]: ...
+
     @abstractmethod
     async def get_all_embeddings_scan(self) -> Optional[EncodedAnswersDm]: ...
 
 
+class EmbeddingsSnapshot(Protocol):
+    @abstractmethod
+    async def get_snapshot(self) -> Optional[EncodedAnswersDm]: ...
+
+
 class ResultSender(Protocol):
     @abstractmethod
-    async def send_answer(self, params) -> None: ...
+    async def send_answer(self, params: AnswerDm) -> None: ...
 
 
 class AnswerPaginator(Protocol):
@@ -45,18 +78,42 @@ class AnswerPaginator(Protocol):
 
 class LoadKnowledgeBase(Protocol):
     @abstractmethod
-    def from_csv(self, delimiter: str = "~") -> AnswerBaseDataDm: ...
+    def stream_csv(self, delimiter: str = "~") -> AsyncIterator[AnswerBaseDataDm]: ...
 
 
 class SaveAnswersCache(Protocol):
     @abstractmethod
-    async def save_answers(self, params: AnswersDataDm) -> AnswersDataDm: ...
+    async def get_answers_versions(self) -> dict[str, int]: ...
 
+    @abstractmethod
+    async def next_version(self) -> int: ...
+
+    @abstractmethod
+    async def save_answers(self, params: AnswersDataDm, version: int) -> None: ...
+
+    @abstractmethod
+    async def commit_version(self, version: int, removed: set[str]) -> None: ...
+
+
+class KnowledgeBaseBuildLock(Protocol):
+    @abstractmethod
+    async def run_once(self, build: Callable[[], Awaitable[None]]) -> None: ...
 
-class CreateAnswersDict(Protocol):
     @abstractmethod
-    def create_answers_data(self, answers: list[AnswersChunksDm]) -> AnswersDataDm: ...
+    async def ensure_held(self) -> None: ...
 
 
-class UUIDGenerator(Protocol):
-    def __call__(self) -> UUID: ...
\ No newline at end of file
+class IndexFileStorage(Protocol):
+    @abstractmethod
+    def save_index_file(self, params: EncodedAnswersDm) -> None: ...
+
+    @abstractmethod
+    def load_index_file(self) -> Optional[EncodedAnswersDm]: ...
+
+
+class CreateAnswersDict(Protocol):
+    @abstractmethod
+    def create_answers_ids(self, knowledge_base: AnswerBaseDataDm) -> list[str]: ...
+
+    @abstractmethod
+    def create_answers_data(self, answers: AnswersGetUuidDm) -> AnswersDataDm: ...
\ No newline at end of file
@@ -1,14 +1,68 @@
+from importlib.util import find_spec
 from os import environ as env
 
-from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from common.pagination import normalize_parse_mode
 
 
 class BertConfig(BaseModel):
     base_path: str = Field(alias="BERT_BASE_PATH")
     model_name: str = Field(alias="BERT_MODEL_NAME")
     threshold: float = Field(alias="BERT_THRESHOLD")
+    top_k: int = Field(alias="BERT_TOP_K", default=3, gt=0)
     query_instruction: str = Field(alias="BERT_QUERY_INSTRUCTION")
     document_instruction: str = Field(alias="BERT_DOCUMENT_INSTRUCTION")
+    query_max_length: int = Field(alias="BERT_QUERY_MAX_LENGTH", default=128, gt=0)
+    document_max_length: int = Field(alias="BERT_DOCUMENT_MAX_LENGTH", default=512, gt=0)
+    encode_batch_size: int = Field(alias="BERT_ENCODE_BATCH_SIZE", default=32, gt=0)
+    ingest_batch_size: int = Field(alias="BERT_INGEST_BATCH_SIZE", default=256, gt=0)
+    embedding_dtype: Literal["float32", "float16"] = Field(alias="BERT_EMBEDDING_DTYPE", default="float32")
+    query_batch_window_ms: float = Field(alias="BERT_QUERY_BATCH_WINDOW_MS", default=10.0, ge=0)
+    query_batch_max_size: int = Field(alias="BERT_QUERY_BATCH_MAX_SIZE", default=32, gt=0)
+    inference_executor: Literal["thread", "process"] = Field(alias="BERT_INFERENCE_EXECUTOR", default="thread")
+    inference_workers: int = Field(alias="BERT_INFERENCE_WORKERS", default=1, gt=0)
+    inference_threads: Optional[int] = Field(alias="BERT_INFERENCE_THREADS", default=None, gt=0)
+    pool_workers: int = Field(alias="BERT_POOL_WORKERS", default=1, gt=0)
+    pool_restart_delay: float = Field(alias="BERT_POOL_RESTART_DELAY", default=1.0, ge=0)
+    inference_max_in_flight: int = Field(alias="BERT_INFERENCE_MAX_IN_FLIGHT", default=2, gt=0)
+    # with "onnx" every pre-fork pool worker builds its own session, so the
+    # weights are not shared copy-on-write between BERT_POOL_WORKERS
+    encoder_backend: Literal["torch", "int8", "onnx"] = Field(alias="BERT_ENCODER_BACKEND", default="torch")
+    onnx_path: Optional[str] = Field(alias="BERT_ONNX_PATH", default=None)
+    query_cache_size: int = Field(alias="BERT_QUERY_CACHE_SIZE", default=10000, gt=0)
+    query_cache_ttl: float = Field(alias="BERT_QUERY_CACHE_TTL", default=86400.0, gt=0)
+    semantic_cache_size: int = Field(alias="BERT_SEMANTIC_CACHE_SIZE", default=1024, ge=0)
+    semantic_cache_threshold: float = Field(alias="BERT_SEMANTIC_CACHE_THRESHOLD", default=0.95, gt=0, le=1)
+    build_lock_lease: float = Field(alias="BERT_BUILD_LOCK_LEASE", default=30.0, gt=0)
+    build_wait_timeout: float = Field(alias="BERT_BUILD_WAIT_TIMEOUT", default=600.0, gt=0)
+    metrics_host: str = Field(alias="BERT_METRICS_HOST", default="0.0.0.0")
+    metrics_port: Optional[int] = Field(alias="BERT_METRICS_PORT", default=None, ge=0)
+    ready_file: Optional[str] = Field(alias="BERT_READY_FILE", default=None)
+    index_path: Optional[str] = Field(alias="BERT_INDEX_PATH", default=None)
+    index_mode: Literal["exact", "ivf"] = Field(alias="BERT_INDEX_MODE", default="exact")
+    ivf_nlist: Optional[int] = Field(alias="BERT_IVF_NLIST", default=None, gt=0)
+    ivf_nprobe: int = Field(alias="BERT_IVF_NPROBE", default=8, gt=0)
+    ivf_train_iterations: int = Field(alias="BERT_IVF_TRAIN_ITERATIONS", default=10, gt=0)
+    snapshot_refresh_interval: float = Field(alias="BERT_SNAPSHOT_REFRESH_INTERVAL", default=5.0, ge=0)
+    answer_page_length: int = Field(alias="BERT_ANSWER_PAGE_LENGTH", default=4096, gt=0, le=4096)
+    answer_parse_mode: Optional[Literal["HTML", "Markdown", "MarkdownV2"]] = Field(
+        alias="BERT_ANSWER_PARSE_MODE", default=None
+    )
+
+    @field_validator("encoder_backend")
+    def check_encoder_backend(cls, value):
+        if value == "onnx" and find_spec("onnxruntime") is None:
+            raise ValueError(
+                "BERT_ENCODER_BACKEND=onnx needs onnxruntime: install the project with the 'onnx' extra"
+            )
+        return value
+
+    @field_validator("answer_parse_mode", mode="before")
+    def normalize_answer_parse_mode(cls, value):
+        return normalize_parse_mode(value) if isinstance(value, str) or value is None else value
 
 
 class RedisConfig(BaseModel):
@@ -16,6 +70,12 @@ class RedisConfig(BaseModel):
     port: int = Field(alias="REDIS_PORT")
     password: str = Field(alias="REDIS_PASSWORD")
     db: int = Field(alias="REDIS_DB")
+    chunk_size: int = Field(alias="REDIS_CHUNK_SIZE", default=1000, gt=0)
+    max_connections: int = Field(alias="REDIS_MAX_CONNECTIONS", default=32, gt=0)
+    pool_timeout: float = Field(alias="REDIS_POOL_TIMEOUT", default=5.0, gt=0)
+    socket_timeout: float = Field(alias="REDIS_SOCKET_TIMEOUT", default=5.0, gt=0)
+    socket_connect_timeout: float = Field(alias="REDIS_SOCKET_CONNECT_TIMEOUT", default=2.0, gt=0)
+    health_check_interval: int = Field(alias="REDIS_HEALTH_CHECK_INTERVAL", default=30, ge=0)
 
 
 class RabbitMQConfig(BaseModel):
@@ -24,6 +84,8 @@ class RabbitMQConfig(BaseModel):
     login: str = Field(alias='RABBITMQ_USER')
     password: str = Field(alias='RABBITMQ_PASSWORD')
     vhost: str = Field(alias='RABBITMQ_VHOST')
+    prefetch_count: int = Field(alias='RABBITMQ_PREFETCH_COUNT', default=64, gt=0)
+    publish_batch_size: int = Field(alias='RABBITMQ_PUBLISH_BATCH_SIZE', default=64, gt=0)
 
 
 class Config(BaseModel):
@@ -1,4 +1,5 @@
 import json
+import time
 
 from dishka.integrations.base import FromDishka as Depends
 from faststream.rabbit import RabbitRouter, RabbitMessage
@@ -8,16 +9,30 @@ from sentence_bert.src.application.interactors import (
     QuestionsHandlerInteractor,
     PrepareKnowledgeBaseInteractor
 )
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
 
 
 TasksController=RabbitRouter()
 
 
-@TasksController.subscri1ber("question_handler")
+@TasksController.subscriber("question_handler")
 async def question_handler(
     message: RabbitMessage,
     prepare_interactor: Depends[PrepareKnowledgeBaseInteractor],
-    handler_interactor: Depends[QuestionsHandlerInteractor]
+    handler_interactor: Depends[QuestionsHandlerInteractor],
+    metrics: Depends[MetricsRegistry]
+) -> None:
+    published_at = message.headers.get("x-published-at")
+    if isinstance(published_at, (int, float)):
+        metrics.stage("queue_wait").observe(max(time.time() - published_at, 0.0))
+    with metrics.stage("handler").time():
+        await _handle(message, prepare_interactor, handler_interactor)
+
+
+async def _handle(
+    message: RabbitMessage,
+    prepare_interactor: PrepareKnowledgeBaseInteractor,
+    handler_interactor: QuestionsHandlerInteractor
 ) -> None:
     data: dict[str|int, str] = json.loads(message.body.decode()) 
     dto=QuestionHandlerDto(
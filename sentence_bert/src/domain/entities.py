@@ -1,7 +1,8 @@
 from dataclasses import dataclass
-from typing import Callable, Optional
 
-from torch import Tensor
+import numpy as np
+
+from sentence_bert.src.domain.index import EmbeddingIndex
 
 
 @dataclass(frozen=True, slots=True)
@@ -16,29 +17,50 @@ class AnswersChunksDm:
 
 @dataclass(frozen=True, slots=True)
 class AnswersGetUuidDm:
+    uuids: list[str]
     chunks: list[list[str]]
-    embendings: list[Tensor]
+    embendings: np.ndarray
 
 
 @dataclass(frozen=True, slots=True)
 class AnswersDataDm:
     answers: dict[str, list[str]]
-    answers_embendings: dict[str, Tensor]
+    answers_embendings: dict[str, np.ndarray]
+
+@dataclass(frozen=True, slots=True)
+class ScoredAnswerDm:
+    uuid: str
+    score: float
+
+
+@dataclass(frozen=True, slots=True)
+class QueryResultDm:
+    answers: list[ScoredAnswerDm]
+    below_threshold: bool
+
 
 @dataclass(frozen=True, slots=True)
 class AnswerDm:
     user_id: str|int
-    answer: Optional[str]
+    result: QueryResultDm
     correlation_id: str
 
 
 @dataclass(frozen=True, slots=True)
 class EncodedAnswersDm:
-    answers: dict[str, Tensor]
+    index: EmbeddingIndex
+    version: int
 
 
 @dataclass(frozen=True, slots=True)
 class ProcessQueryDm:
     query: str
-    knowledge_base_embeddings: dict[str, Tensor]
-    normalization: Callable[[Tensor], Tensor]
\ No newline at end of file
+    knowledge_base_embeddings: EmbeddingIndex
+    knowledge_base_version: int
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessQueriesDm:
+    queries: list[str]
+    knowledge_base_embeddings: EmbeddingIndex
+    knowledge_base_version: int
\ No newline at end of file
@@ -0,0 +1,163 @@
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True, slots=True)
+class EmbeddingIndex:
+    matrix: np.ndarray
+    keys: np.ndarray
+
+    @classmethod
+    def build(cls, keys: list[str], vectors: np.ndarray) -> "EmbeddingIndex":
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(keys), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return cls(matrix=matrix, keys=np.asarray(keys, dtype=str))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def top_k(self, query: np.ndarray, k: int = 1) -> list[tuple[str, float]]:
+        return self.top_k_batch(np.asarray(query).reshape(1, -1), k)[0]
+
+    def top_k_batch(self, queries: np.ndarray, k: int = 1) -> list[list[tuple[str, float]]]:
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        scores = queries @ self.matrix.T
+        k = min(k, scores.shape[1])
+        if k < scores.shape[1]:
+            candidates = np.argpartition(scores, -k, axis=1)[:, -k:]
+        else:
+            candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1)
+        best = np.take_along_axis(candidates, order, axis=1)
+        return [
+            [(str(self.keys[i]), float(row_scores[i])) for i in row]
+            for row, row_scores in zip(best, scores)
+        ]
+
+
+RETRAIN_GROWTH = 2.0
+ASSIGN_CHUNK_SIZE = 8192
+TRAIN_POINTS_PER_LIST = 64
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignment = np.empty(len(matrix), dtype=np.int64)
+    for start in range(0, len(matrix), ASSIGN_CHUNK_SIZE):
+        chunk = matrix[start:start + ASSIGN_CHUNK_SIZE]
+        assignment[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignment
+
+
+def _train_centroids(
+    matrix: np.ndarray,
+    nlist: int,
+    iterations: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    sample_size = min(len(matrix), nlist * TRAIN_POINTS_PER_LIST)
+    sample = matrix[np.sort(rng.choice(len(matrix), sample_size, replace=False))]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _assign(sample, centroids)
+        order = np.argsort(assignment, kind="stable")
+        lists, starts = np.unique(assignment[order], return_index=True)
+        sums = np.add.reduceat(sample[order], starts, axis=0)
+        empty = np.setdiff1d(np.arange(nlist), lists)
+        centroids[lists] = _normalize_rows(sums)
+        centroids[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+    return centroids
+
+
+@dataclass(frozen=True, slots=True)
+class IvfIndex(EmbeddingIndex):
+    """Inverted-file index: rows are grouped by nearest centroid and only the
+    ``nprobe`` closest lists are scored for each query."""
+
+    centroids: np.ndarray
+    offsets: np.ndarray
+    nprobe: int
+    trained_size: int
+
+    @classmethod
+    def from_index(
+        cls,
+        index: EmbeddingIndex,
+        nlist: Optional[int],
+        nprobe: int,
+        iterations: int,
+        previous: Optional["IvfIndex"] = None
+    ) -> "IvfIndex":
+        size, dim = index.matrix.shape
+        wanted = min(nlist or max(int(4 * np.sqrt(size)), 1), max(size, 1))
+        reuse = (
+            previous is not None
+            and len(previous) > 0
+            and previous.centroids.shape[1] == dim
+            and (nlist is None or len(previous.centroids) == wanted)
+            and previous.trained_size / RETRAIN_GROWTH
+            <= size
+            <= previous.trained_size * RETRAIN_GROWTH
+        )
+        if reuse:
+            centroids, trained_size = previous.centroids, previous.trained_size
+            assignment = previous._reuse_assignment(index, centroids)
+        else:
+            rng = np.random.default_rng(0)
+            centroids = _train_centroids(index.matrix, wanted, iterations, rng) if size else (
+                np.zeros((1, dim), dtype=np.float32)
+            )
+            trained_size = size
+            assignment = _assign(index.matrix, centroids)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(len(centroids) + 1))
+        return cls(
+            matrix=np.ascontiguousarray(index.matrix[order]),
+            keys=index.keys[order],
+            centroids=np.ascontiguousarray(centroids, dtype=np.float32),
+            offsets=offsets.astype(np.int64),
+            nprobe=nprobe,
+            trained_size=trained_size
+        )
+
+    def _reuse_assignment(self, index: EmbeddingIndex, centroids: np.ndarray) -> np.ndarray:
+        lists = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        sorter = np.argsort(self.keys)
+        position = np.searchsorted(self.keys, index.keys, sorter=sorter).clip(max=len(sorter) - 1)
+        previous_rows = sorter[position]
+        known = self.keys[previous_rows] == index.keys
+        assignment = np.empty(len(index.keys), dtype=np.int64)
+        assignment[known] = lists[previous_rows[known]]
+        assignment[~known] = _assign(index.matrix[~known], centroids)
+        return assignment
+
+    def with_nprobe(self, nprobe: int) -> "IvfIndex":
+        return replace(self, nprobe=nprobe)
+
+    def top_k_batch(self, queries: np.ndarray, k: int = 1) -> list[list[tuple[str, float]]]:
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        nprobe = min(self.nprobe, len(self.centroids))
+        coarse = queries @ self.centroids.T
+        probes = np.argpartition(coarse, -nprobe, axis=1)[:, -nprobe:]
+        results = []
+        for query, lists in zip(queries, probes):
+            rows = [np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists]
+            candidates = np.concatenate(rows)
+            if not len(candidates):
+                results.append(EmbeddingIndex.top_k_batch(self, query, k)[0])
+                continue
+            scores = np.concatenate([
+                self.matrix[self.offsets[i]:self.offsets[i + 1]] @ query for i in lists
+            ])
+            top = min(k, len(scores))
+            best = np.argpartition(scores, -top)[-top:]
+            best = best[np.argsort(-scores[best])]
+            results.append([(str(self.keys[candidates[i]]), float(scores[i])) for i in best])
+        return results
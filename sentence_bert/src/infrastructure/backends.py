@@ -0,0 +1,85 @@
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+import torch
+from transformers import PretrainedConfig, T5EncoderModel
+from transformers.modeling_outputs import BaseModelOutput
+
+from sentence_bert.src.config import BertConfig
+
+
+ONNX_OPSET = 17
+
+
+class OnnxEncoder:
+    """Drop-in replacement for ``T5EncoderModel.__call__`` backed by ONNX Runtime."""
+
+    def __init__(self, path: Path, config: PretrainedConfig, threads: Optional[int]) -> None:
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.config = config
+        self._session = onnxruntime.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor, **_: Any) -> BaseModelOutput:
+        (last_hidden_state,) = self._session.run(
+            ["last_hidden_state"],
+            {
+                "input_ids": input_ids.numpy().astype(np.int64),
+                "attention_mask": attention_mask.numpy().astype(np.int64),
+            }
+        )
+        return BaseModelOutput(last_hidden_state=torch.from_numpy(last_hidden_state))
+
+
+EncoderModel = Union[T5EncoderModel, OnnxEncoder]
+
+
+def onnx_path(config: BertConfig) -> Path:
+    if config.onnx_path:
+        return Path(config.onnx_path)
+    return Path(config.base_path).parent / f"{config.model_name.replace('/', '--')}.onnx"
+
+
+def export_onnx(config: BertConfig, model: T5EncoderModel) -> Path:
+    path = onnx_path(config)
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    dummy = torch.ones((2, 8), dtype=torch.long)
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (dummy, dummy),
+            str(temp_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+    os.replace(temp_path, path)
+    return path
+
+
+def load_encoder(config: BertConfig, model: T5EncoderModel) -> EncoderModel:
+    if config.encoder_backend == "int8":
+        return torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        ).eval()
+    if config.encoder_backend == "onnx":
+        return OnnxEncoder(export_onnx(config, model), model.config, config.inference_threads)
+    return model
@@ -0,0 +1,94 @@
+import asyncio
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Optional
+
+from sentence_bert.src.application.interfaces import (
+    BatchKnowledgeBaseService,
+    KnowledgeBaseService
+)
+from sentence_bert.src.config import BertConfig
+from sentence_bert.src.domain.entities import ProcessQueriesDm, ProcessQueryDm, QueryResultDm
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+
+
+@dataclass(slots=True)
+class _PendingQuery:
+    params: ProcessQueryDm
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class QueryMicroBatcher(KnowledgeBaseService):
+    def __init__(
+        self,
+        service: BatchKnowledgeBaseService,
+        config: BertConfig,
+        metrics: MetricsRegistry,
+    ) -> None:
+        self._service = service
+        self._window = config.query_batch_window_ms / 1000
+        self._max_batch_size = config.query_batch_max_size
+        self._queue: asyncio.Queue[_PendingQuery] = asyncio.Queue()
+        self._collector: Optional[asyncio.Task] = None
+        self._flushes: set[asyncio.Task] = set()
+        self._batch_wait = metrics.stage("batch_wait")
+
+    async def process_query(self, params: ProcessQueryDm) -> QueryResultDm:
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingQuery(params=params, future=future, enqueued_at=perf_counter()))
+        return await future
+
+    async def close(self) -> None:
+        if self._collector is not None:
+            self._collector.cancel()
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._window
+            while len(batch) < self._max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            flush = asyncio.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[_PendingQuery]) -> None:
+        flushed_at = perf_counter()
+        for pending in batch:
+            self._batch_wait.observe(flushed_at - pending.enqueued_at)
+        groups: dict[int, list[_PendingQuery]] = {}
+        for pending in batch:
+            groups.setdefault(id(pending.params.knowledge_base_embeddings), []).append(pending)
+        for group in groups.values():
+            try:
+                results = await self._service.process_queries(
+                    ProcessQueriesDm(
+                        queries=[pending.params.query for pending in group],
+                        knowledge_base_embeddings=group[0].params.knowledge_base_embeddings,
+                        knowledge_base_version=group[0].params.knowledge_base_version
+                    )
+                )
+            except Exception as error:
+                for pending in group:
+                    if not pending.future.done():
+                        pending.future.set_exception(error)
+                continue
+            for pending, result in zip(group, results):
+                if not pending.future.done():
+                    pending.future.set_result(result)
@@ -13,4 +13,5 @@ def new_broker(rabbitmq_config: RabbitMQConfig) -> RabbitBroker:
             password=rabbitmq_config.password,
         ),
         virtualhost=rabbitmq_config.vhost,
+        max_consumers=rabbitmq_config.prefetch_count,
     )
\ No newline at end of file
@@ -1,11 +1,205 @@
-from redis.asyncio import Redis
+from collections import OrderedDict
+from hashlib import sha256
+from time import monotonic
+from typing import Optional
+
+import numpy as np
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.connection import AbstractConnection
+
+from sentence_bert.src.application.interfaces import QueryEmbeddingsCache, SemanticAnswersCache
+from sentence_bert.src.config import BertConfig, RedisConfig
+from sentence_bert.src.domain.entities import QueryResultDm
+from sentence_bert.src.infrastructure.codec import EmbeddingCodec
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+
+
+QUERY_CACHE_REQUESTS = "sentence_bert_query_cache_requests_total"
+SEMANTIC_CACHE_REQUESTS = "sentence_bert_semantic_cache_requests_total"
+REDIS_POOL_CONNECTIONS = "sentence_bert_redis_pool_connections"
+REDIS_POOL_UTILIZATION = "sentence_bert_redis_pool_utilization"
+
+class ObservedConnectionPool(BlockingConnectionPool):
+    """Tracks its own checkouts so the pool gauges do not depend on redis-py internals."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.checked_out: set[AbstractConnection] = set()
+        self.created = 0
+
+    def reset(self) -> None:
+        super().reset()
+        self.checked_out = set()
+        self.created = 0
+
+    def make_connection(self) -> AbstractConnection:
+        connection = super().make_connection()
+        self.created += 1
+        return connection
+
+    async def get_connection(self, *args, **kwargs) -> AbstractConnection:
+        connection = await super().get_connection(*args, **kwargs)
+        self.checked_out.add(connection)
+        return connection
+
+    async def release(self, connection: AbstractConnection) -> None:
+        # also reached, before any checkout is recorded, when a connection fails its check
+        self.checked_out.discard(connection)
+        await super().release(connection)
 
-from sentence_bert.src.config import RedisConfig
 
 def init_redis(config: RedisConfig) -> Redis:
-    return Redis(
-        host=config.host, 
-        port=config.port, 
+    """One client over a bounded pool; closing the client disconnects the pool."""
+    pool = ObservedConnectionPool(
+        max_connections=config.max_connections,
+        timeout=config.pool_timeout,
+        host=config.host,
+        port=config.port,
         db=config.db,
-        password=config.password
-    )
\ No newline at end of file
+        password=config.password,
+        socket_timeout=config.socket_timeout,
+        socket_connect_timeout=config.socket_connect_timeout,
+        health_check_interval=config.health_check_interval
+    )
+    return Redis.from_pool(pool)
+
+
+def observe_redis_pool(redis: Redis, metrics: MetricsRegistry) -> None:
+    pool = redis.connection_pool
+    if not isinstance(pool, ObservedConnectionPool):
+        return
+
+    def in_use() -> float:
+        return len(pool.checked_out)
+
+    metrics.gauge(REDIS_POOL_CONNECTIONS, "Redis pool connections by state", in_use, state="in_use")
+    metrics.gauge(
+        REDIS_POOL_CONNECTIONS,
+        "Redis pool connections by state",
+        lambda: pool.created - in_use(),
+        state="idle"
+    )
+    metrics.gauge(
+        REDIS_POOL_UTILIZATION,
+        "Share of the Redis pool's max_connections currently checked out",
+        lambda: in_use() / pool.max_connections
+    )
+
+
+class QueryEmbeddingCache(QueryEmbeddingsCache):
+    def __init__(self, redis: Redis, config: BertConfig, metrics: MetricsRegistry) -> None:
+        self._redis = redis
+        self._codec = EmbeddingCodec(config.embedding_dtype)
+        self._max_size = config.query_cache_size
+        self._ttl = config.query_cache_ttl
+        self._salt = (
+            f"{config.model_name}\0{config.query_instruction}\0{config.query_max_length}\0"
+            f"{config.encoder_backend}\0{config.onnx_path}\0{config.embedding_dtype}\0"
+        )
+        self._local: OrderedDict[str, tuple[float, np.ndarray]] = OrderedDict()
+        help_text = "Query embedding cache lookups by result"
+        self.local_hits = metrics.counter(QUERY_CACHE_REQUESTS, help_text, result="local_hit")
+        self.redis_hits = metrics.counter(QUERY_CACHE_REQUESTS, help_text, result="redis_hit")
+        self.misses = metrics.counter(QUERY_CACHE_REQUESTS, help_text, result="miss")
+
+    def _key(self, query: str) -> str:
+        normalized = " ".join(query.casefold().split())
+        return sha256(f"{self._salt}{normalized}".encode()).hexdigest()
+
+    def _get_local(self, key: str) -> Optional[np.ndarray]:
+        item = self._local.get(key)
+        if item is None:
+            return None
+        expires_at, embedding = item
+        if expires_at < monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return embedding
+
+    def _put_local(self, key: str, embedding: np.ndarray) -> None:
+        self._local[key] = (monotonic() + self._ttl, embedding)
+        self._local.move_to_end(key)
+        while len(self._local) > self._max_size:
+            self._local.popitem(last=False)
+
+    async def get_many(self, queries: list[str]) -> list[Optional[np.ndarray]]:
+        keys = [self._key(query) for query in queries]
+        embeddings = [self._get_local(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        self.local_hits.inc(len(keys) - len(missing))
+        if not missing:
+            return embeddings
+        blobs = await self._redis.mget([f"query_embedding:{keys[i]}" for i in missing])
+        for i, data in zip(missing, blobs):
+            if not data:
+                self.misses.inc()
+                continue
+            embedding = self._codec.decode(data).astype(np.float32)
+            self._put_local(keys[i], embedding)
+            embeddings[i] = embedding
+            self.redis_hits.inc()
+        return embeddings
+
+    async def set_many(self, queries: list[str], embeddings: np.ndarray) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for query, embedding in zip(queries, embeddings):
+                key = self._key(query)
+                self._put_local(key, embedding)
+                pipe.set(
+                    f"query_embedding:{key}",
+                    self._codec.encode(embedding, version=0),
+                    px=int(self._ttl * 1000)
+                )
+            await pipe.execute()
+
+
+class SemanticAnswerCache(SemanticAnswersCache):
+    def __init__(self, config: BertConfig, metrics: MetricsRegistry) -> None:
+        self._capacity = config.semantic_cache_size
+        self._threshold = config.semantic_cache_threshold
+        self._matrix: Optional[np.ndarray] = None
+        self._results: list[Optional[QueryResultDm]] = [None] * self._capacity
+        self._size = 0
+        self._next = 0
+        self._version: Optional[int] = None
+        help_text = "Semantic answer cache lookups by result"
+        self.hits = metrics.counter(SEMANTIC_CACHE_REQUESTS, help_text, result="hit")
+        self.misses = metrics.counter(SEMANTIC_CACHE_REQUESTS, help_text, result="miss")
+
+    def _reset(self, version: int) -> None:
+        self._matrix = None
+        self._results = [None] * self._capacity
+        self._size = 0
+        self._next = 0
+        self._version = version
+
+    def lookup(self, embeddings: np.ndarray, version: int) -> list[Optional[QueryResultDm]]:
+        if version != self._version:
+            self._reset(version)
+        if self._matrix is None or self._size == 0:
+            self.misses.inc(len(embeddings))
+            return [None] * len(embeddings)
+        scores = embeddings @ self._matrix[:self._size].T
+        best = scores.argmax(axis=1)
+        results = [
+            self._results[j] if scores[i, j] >= self._threshold else None
+            for i, j in enumerate(best)
+        ]
+        resolved = sum(result is not None for result in results)
+        self.hits.inc(resolved)
+        self.misses.inc(len(results) - resolved)
+        return results
+
+    def store(self, embeddings: np.ndarray, results: list[QueryResultDm], version: int) -> None:
+        if self._capacity == 0:
+            return
+        if version != self._version:
+            self._reset(version)
+        if self._matrix is None:
+            self._matrix = np.zeros((self._capacity, embeddings.shape[1]), dtype=np.float32)
+        for embedding, result in zip(embeddings, results):
+            self._matrix[self._next] = embedding
+            self._results[self._next] = result
+            self._next = (self._next + 1) % self._capacity
+            self._size = min(self._size + 1, self._capacity)
@@ -0,0 +1,40 @@
+import struct
+
+import numpy as np
+
+
+class EmbeddingCodec:
+    MAGIC = b"EMB1"
+    HEADER = struct.Struct("<4sB3xIQ")
+    DTYPES = {
+        "float32": (0, np.dtype("<f4")),
+        "float16": (1, np.dtype("<f2")),
+    }
+
+    def __init__(self, dtype: str = "float32") -> None:
+        self._code, self._dtype = self.DTYPES[dtype]
+        self._by_code = {code: dtype for code, dtype in self.DTYPES.values()}
+
+    def encode(self, vector: np.ndarray, version: int) -> bytes:
+        row = np.ascontiguousarray(vector, dtype=self._dtype).reshape(-1)
+        header = self.HEADER.pack(self.MAGIC, self._code, row.shape[0], version)
+        return header + row.tobytes()
+
+    def read_header(self, data: bytes) -> tuple[int, np.dtype, int]:
+        magic, code, dim, version = self.HEADER.unpack_from(data)
+        if magic != self.MAGIC or code not in self._by_code:
+            raise ValueError("Unsupported embedding format")
+        return dim, self._by_code[code], version
+
+    def decode(self, data: bytes) -> np.ndarray:
+        dim, dtype, _ = self.read_header(data)
+        return np.frombuffer(data, dtype=dtype, count=dim, offset=self.HEADER.size)
+
+    def decode_many(self, blobs: list[bytes]) -> np.ndarray:
+        if not blobs:
+            return np.empty((0, 0), dtype=np.float32)
+        dim, _, _ = self.read_header(blobs[0])
+        matrix = np.empty((len(blobs), dim), dtype=np.float32)
+        for row, data in zip(matrix, blobs):
+            row[:] = self.decode(data)
+        return matrix
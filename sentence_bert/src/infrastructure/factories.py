@@ -1,9 +1,9 @@
-from transformers import T5Tokenizer, T5EncoderModel
+from transformers import AutoTokenizer, PreTrainedTokenizerBase, T5EncoderModel
 
 from sentence_bert.src.config import BertConfig
 
 async def get_model(config: BertConfig) -> T5EncoderModel: 
-    return T5EncoderModel.from_pretrained(config.model_name)
+    return T5EncoderModel.from_pretrained(config.model_name).eval()
 
-async def get_tokenizer(config: BertConfig) -> T5Tokenizer:
-    return T5Tokenizer.from_pretrained(config.model_name)
\ No newline at end of file
+async def get_tokenizer(config: BertConfig) -> PreTrainedTokenizerBase:
+    return AutoTokenizer.from_pretrained(config.model_name, use_fast=True)
\ No newline at end of file
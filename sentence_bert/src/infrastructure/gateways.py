@@ -1,29 +1,33 @@
+import asyncio
 import csv
-import json
-from io import BytesIO
-from typing import Optional
+from itertools import islice
+from time import monotonic
+from typing import AsyncIterator, Iterable, Iterator, Optional, TypeVar
+from uuid import UUID, uuid5
 
 from redis.asyncio import Redis
-from faststream.rabbit import RabbitBroker
-from faststream.rabbit.message import RabbitMessage
 
-from transformers import T5Tokenizer, T5EncoderModel
-from transformers.modeling_outputs import BaseModelOutput
-from torch.nn.functional import cosine_similarity
+import numpy as np
 import torch
 
+from common.pagination import Paginator
 from sentence_bert.src.application.interfaces import (
     AnswerPaginator,
+    BatchKnowledgeBaseService,
+    CacheEmbendingsGetter,
     CreateAnswersDict,
+    EmbeddingsSnapshot,
     KnowledgeBaseService,
     EmbendingNormalization,
     EmbendingEncoder,
+    IndexFileStorage,
     LoadKnowledgeBase,
+    QueryEmbeddingsCache,
     ResultSender,
     SaveAnswersCache,
-    UUIDGenerator
+    SemanticAnswersCache
 )
-from sentence_bert.src.config import BertConfig
+from sentence_bert.src.config import BertConfig, RedisConfig
 from sentence_bert.src.domain.entities import (
     AnswerBaseDataDm, 
     AnswerDm,
@@ -31,94 +35,221 @@ from sentence_bert.src.domain.entities import (
     AnswersDataDm,
     AnswersGetUuidDm, 
     EncodedAnswersDm, 
-    ProcessQueryDm
+    ProcessQueriesDm,
+    ProcessQueryDm,
+    QueryResultDm,
+    ScoredAnswerDm
 )
+from sentence_bert.src.domain.index import EmbeddingIndex
+from sentence_bert.src.infrastructure.codec import EmbeddingCodec
+from sentence_bert.src.infrastructure.inference import InferenceExecutor, l2_normalization
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+from sentence_bert.src.infrastructure.publisher import BatchingPublisher
+
+
+KNOWLEDGE_BASE_VERSION_KEY = "knowledge_base:version"
+KNOWLEDGE_BASE_NAMESPACE = UUID("5b1f6a52-3c0e-4f0b-9a8e-2d7c4e9b1a63")
+# part of the answer id salt: bumping it re-ingests every answer in the new layout
+ANSWER_PAGES_FORMAT = "pages-list-v2"
+
+T = TypeVar("T")
+
+
+def _chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
 class KnowledgeBaseGateway(
     KnowledgeBaseService,
+    BatchKnowledgeBaseService,
     EmbendingNormalization,
     EmbendingEncoder,
     ResultSender
 ):
     def __init__(
         self, 
-        model: T5EncoderModel,
-        tokenizer: T5Tokenizer,
+        executor: InferenceExecutor,
+        query_cache: QueryEmbeddingsCache,
+        answer_cache: SemanticAnswersCache,
         config: BertConfig, 
-        rabbitmq_broker: RabbitBroker,
-        redis: Redis,
+        publisher: BatchingPublisher,
+        metrics: MetricsRegistry,
     ) -> None:
-        self._model = model
-        self._tokenizer = tokenizer
+        self._executor = executor
+        self._query_cache = query_cache
+        self._answer_cache = answer_cache
         self._query_instruction = config.query_instruction
         self._document_instruction = config.document_instruction
-        self._broker = rabbitmq_broker
-        self._redis = redis
+        self._query_max_length = config.query_max_length
+        self._document_max_length = config.document_max_length
+        self._top_k = config.top_k
+        self._threshold = config.threshold
+        self._publisher = publisher
+        self._query_cache_time = metrics.stage("query_cache")
+        self._semantic_cache_time = metrics.stage("semantic_cache")
+        self._score_time = metrics.stage("score")
+        self._publish_time = metrics.stage("publish")
 
     def l2_normalization(self, embeddings: torch.Tensor) -> torch.Tensor:
-        return embeddings / embeddings.norm(dim=1, keepdim=True)
-
-    def encode_knowledge_base(self, knowledge_base: AnswersDataDm) -> EncodedAnswersDm:
-        encoded_knowledge_base = {}
-        for key, doc in knowledge_base.answers.items():
-            inputs = self._tokenizer(
-                f"{self._document_instruction} {doc}",
-                return_tensors="pt",
-                padding=True,
-                truncation=True
+        return l2_normalization(embeddings)
+
+    async def encode_knowledge_base(self, knowledge_base: AnswerBaseDataDm) -> np.ndarray:
+        return await self._executor.encode(
+            [f"{self._document_instruction} {doc}" for doc in knowledge_base.answers],
+            self._document_max_length
+        )
+
+    async def process_queries(self, params: ProcessQueriesDm) -> list[QueryResultDm]:
+        with self._query_cache_time.time():
+            embeddings = await self._query_cache.get_many(params.queries)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = await self._executor.encode(
+                [f"{self._query_instruction} {params.queries[i]}" for i in missing],
+                self._query_max_length
             )
-            output: BaseModelOutput = self._model(**inputs)
-            embedding = output.last_hidden_state.mean(dim=1)
-            normalized_embedding = self.l2_normalization(embedding)
-            encoded_knowledge_base[key] = normalized_embedding
-        return EncodedAnswersDm(answers=encoded_knowledge_base)
+            await self._query_cache.set_many([params.queries[i] for i in missing], encoded)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+        query_embeddings = np.stack(embeddings)
+        with self._semantic_cache_time.time():
+            results = self._answer_cache.lookup(query_embeddings, params.knowledge_base_version)
+        unresolved = [i for i, result in enumerate(results) if result is None]
+        if unresolved:
+            with self._score_time.time():
+                scored = params.knowledge_base_embeddings.top_k_batch(
+                    query_embeddings[unresolved], k=self._top_k
+                )
+            for i, hits in zip(unresolved, scored):
+                results[i] = QueryResultDm(
+                    answers=[ScoredAnswerDm(uuid=uuid, score=score) for uuid, score in hits],
+                    below_threshold=not hits or hits[0][1] < self._threshold
+                )
+            self._answer_cache.store(
+                query_embeddings[unresolved],
+                [results[i] for i in unresolved],
+                params.knowledge_base_version
+            )
+        return results
 
-    async def get_all_embeddings_scan(self) -> Optional[EncodedAnswersDm]:
-        async with self._redis as redis:
-            cursor = "0"
-            embeddings = {}
-            while cursor != "0":
-                cursor, keys = await redis.scan(cursor=cursor, match="embedding:*", count=100)
-                for key in keys:
-                    key: str
-                    data = await redis.get(key)
-                    if data:
-                        buffer = BytesIO(data)
-                        embeddings[key.split(":")[1]] = torch.load(buffer)
-            return EncodedAnswersDm(answers=embeddings) if embeddings else None
-
-    async def process_query(self, params: ProcessQueryDm) -> str:
-        inputs = self._tokenizer(
-            f"{self._query_instruction} {params.query}",
-            return_tensors="pt",
-            padding=True,
-            truncation=True
+    async def process_query(self, params: ProcessQueryDm) -> QueryResultDm:
+        results = await self.process_queries(
+            ProcessQueriesDm(
+                queries=[params.query],
+                knowledge_base_embeddings=params.knowledge_base_embeddings,
+                knowledge_base_version=params.knowledge_base_version
+            )
         )
-        output: BaseModelOutput = self._model(**inputs)
-        query_embedding = output.last_hidden_state.mean(dim=1)
-        query_embedding = params.normalization(query_embedding)
-        similarities = {
-            key: cosine_similarity(query_embedding, embedding).item()
-            for key, embedding in params.knowledge_base_embeddings.items()
-        }
-        return max(similarities, key=similarities.get)
+        return results[0]
 
     async def send_answer(self, params: AnswerDm) -> None:
-        async with self._broker as broker:
-            await broker.publish(
-                RabbitMessage(
-                    body={
-                        "user_id": params.user_id,
-                        "answer": params.answer,
-                    }
-                ),
+        with self._publish_time.time():
+            await self._publisher.publish(
+                {
+                    "user_id": params.user_id,
+                    "answer_uuid": (
+                        params.result.answers[0].uuid if params.result.answers else None
+                    ),
+                    "answers": [
+                        {"uuid": answer.uuid, "score": answer.score}
+                        for answer in params.result.answers
+                    ],
+                    "below_threshold": params.result.below_threshold,
+                },
                 exchange="custom_model",
                 routing_key="send_answer",
                 correlation_id=params.correlation_id
             )
 
 
+class EmbeddingsSnapshotGateway(
+    CacheEmbendingsGetter,
+    EmbeddingsSnapshot
+):
+    def __init__(
+        self,
+        redis: Redis,
+        config: BertConfig,
+        redis_config: RedisConfig,
+        index_file: IndexFileStorage,
+        metrics: MetricsRegistry,
+    ) -> None:
+        self._redis = redis
+        self._index_file = index_file
+        self._load_time = metrics.stage("snapshot_load")
+        self._scan_time = metrics.stage("redis_scan")
+        self._chunk_size = redis_config.chunk_size
+        self._codec = EmbeddingCodec(config.embedding_dtype)
+        self._refresh_interval = config.snapshot_refresh_interval
+        self._snapshot: Optional[EncodedAnswersDm] = None
+        # version the snapshot was loaded for; a committed version with no rows
+        # leaves the snapshot empty but is still cached until the next check
+        self._version: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._version is not None
+            and monotonic() - self._checked_at < self._refresh_interval
+        )
+
+    async def get_snapshot(self) -> Optional[EncodedAnswersDm]:
+        if self._is_fresh():
+            return self._snapshot
+        async with self._lock:
+            if self._is_fresh():
+                return self._snapshot
+            version = await self.get_knowledge_base_version()
+            if version is None:
+                self._snapshot = None
+            elif version != self._version:
+                with self._load_time.time():
+                    snapshot = self._index_file.load_index_file()
+                if snapshot is None or snapshot.version != version:
+                    with self._scan_time.time():
+                        snapshot = await self.get_all_embeddings_scan()
+                self._snapshot = snapshot
+            self._version = version
+            self._checked_at = monotonic()
+            return self._snapshot
+
+    async def get_knowledge_base_version(self) -> Optional[int]:
+        version = await self._redis.get(KNOWLEDGE_BASE_VERSION_KEY)
+        return int(version) if version is not None else None
+
+    async def get_all_embeddings_scan(self) -> Optional[EncodedAnswersDm]:
+        version = await self.get_knowledge_base_version()
+        if version is None:
+            return None
+        cursor = 0
+        embeddings = {}
+        while True:
+            cursor, keys = await self._redis.scan(
+                cursor=cursor,
+                match="embedding:*",
+                count=self._chunk_size
+            )
+            for keys_chunk in _chunked(keys, self._chunk_size):
+                for key, data in zip(keys_chunk, await self._redis.mget(keys_chunk)):
+                    # rows stamped with a newer version belong to a build not committed yet
+                    if data and self._codec.read_header(data)[2] <= version:
+                        embeddings[key.decode().split(":", 1)[1]] = data
+            if cursor == 0:
+                break
+        if not embeddings:
+            return None
+        return EncodedAnswersDm(
+            index=EmbeddingIndex.build(
+                keys=list(embeddings),
+                vectors=self._codec.decode_many(list(embeddings.values()))
+            ),
+            version=version
+        )
+
+
 class KnowledgeBasePrepareGateway(
     LoadKnowledgeBase,
     CreateAnswersDict,
@@ -129,68 +260,113 @@ class KnowledgeBasePrepareGateway(
         self, 
         redis: Redis,
         config: BertConfig,
-        uuid_generator: UUIDGenerator,
+        redis_config: RedisConfig,
+        metrics: MetricsRegistry,
     ) -> None:
         self._redis = redis
         self._config = config 
-        self._uuid_generator = uuid_generator
+        self._chunk_size = redis_config.chunk_size
+        self._rebuilds = metrics.counter(
+            "sentence_bert_knowledge_base_rebuilds_total",
+            "Knowledge base versions committed after a changed CSV"
+        )
+        self._blank_rows = metrics.counter(
+            "sentence_bert_knowledge_base_blank_rows_total",
+            "CSV rows skipped because their answer is empty"
+        )
+        self._codec = EmbeddingCodec(config.embedding_dtype)
+        self._paginator = Paginator(config.answer_page_length, config.answer_parse_mode)
 
-    def from_csv(self, delimiter: str = "~") -> AnswerBaseDataDm:
-        answers_list = []
+    async def stream_csv(self, delimiter: str = "~") -> AsyncIterator[AnswerBaseDataDm]:
         with open(
             file=self._config.base_path, 
             mode="r", 
             encoding="utf-8"
         ) as file:
             reader = csv.reader(file, delimiter=delimiter)
-            for row in reader:
-                if len(row) == 2:
-                    _, answer = row
-                    answers_list.append(answer.strip())
-        return AnswerBaseDataDm(answers=answers_list)
+            for answers in _chunked(self._parse_rows(reader), self._config.ingest_batch_size):
+                yield AnswerBaseDataDm(answers=answers)
+
+    def _parse_rows(self, reader: Iterable[list[str]]) -> Iterator[str]:
+        for row in reader:
+            if len(row) != 2:
+                continue
+            answer = row[1].strip()
+            if not answer:
+                # a blank answer has no pages to send and would still be matched
+                self._blank_rows.inc()
+                continue
+            yield answer
 
     async def paginate_answer(self, text: str) -> AnswersChunksDm:
-        min_length = 2048
-        max_length = 4096
-        chunks = []
-        i = 0
-        while i < len(text):
-            chunk_size = max_length if (len(text) - i) > max_length \
-                else min(max_length, len(text) - i)
-            chunks.append(text[i:i + chunk_size])
-            i += chunk_size
-        if len(chunks[-1]) < min_length:
-            last_chunk = chunks.pop()
-            total_length = sum(len(chunk) for chunk in chunks) + len(last_chunk)
-            avg_length = total_length // len(chunks)
-            redistributed_chunks = []
-            start = 0
-            for _ in range(len(chunks)):
-                redistributed_chunks.append(text[start:start + avg_length])
-                start += avg_length
-            redistributed_chunks.append(text[start:])
-            return AnswersChunksDm(chunks=redistributed_chunks)
-        return AnswersChunksDm(chunks=chunks)
+        return AnswersChunksDm(chunks=self._paginator.paginate(text))
+
+    def create_answers_ids(self, knowledge_base: AnswerBaseDataDm) -> list[str]:
+        salt = (
+            f"{self._config.model_name}\0{self._config.document_instruction}\0"
+            f"{self._config.document_max_length}\0{ANSWER_PAGES_FORMAT}\0"
+            f"{self._config.answer_page_length}\0{self._config.answer_parse_mode}\0"
+        )
+        return [
+            str(uuid5(KNOWLEDGE_BASE_NAMESPACE, f"{salt}{answer}"))
+            for answer in knowledge_base.answers
+        ]
 
     def create_answers_data(self, answers: AnswersGetUuidDm) -> AnswersDataDm:
-        answers_dict = {}
-        answers_embending_dict = {}
-        for answer, answer_embending in zip(answers.chunks, answers.embendings):
-            uuid = self._uuid_generator()
-            answers_dict[uuid] = answer
-            answers_embending_dict[uuid] = answer_embending
         return AnswersDataDm(
-            answers=answers_dict,
-            answers_embendings=answers_embending_dict
+            answers=dict(zip(answers.uuids, answers.chunks)),
+            answers_embendings=dict(zip(answers.uuids, answers.embendings))
         )
 
-    async def save_answers(self, params: AnswersDataDm) -> None:
-        async with self._redis as redis:
-            for uuid, answer_list in params.answers.items():
-                serialized_data = json.dumps(answer_list)
-                await redis.set(f"answer:{uuid}", serialized_data)
-            for uuid, embedding in params.answers_embendings.items():
-                buffer = BytesIO()
-                torch.save(embedding, buffer)
-                serialized_embedding = buffer.getvalue()
-                await redis.set(f"embedding:{uuid}", serialized_embedding)
\ No newline at end of file
+    async def get_answers_versions(self) -> dict[str, int]:
+        """Stored answer ids with the KB version stamped on each row."""
+        versions: dict[str, int] = {}
+        keys = []
+        async for key in self._redis.scan_iter(match="embedding:*", count=self._chunk_size):
+            keys.append(key)
+            if len(keys) == self._chunk_size:
+                versions.update(await self._read_versions(keys))
+                keys = []
+        if keys:
+            versions.update(await self._read_versions(keys))
+        return versions
+
+    async def _read_versions(self, keys: list[bytes]) -> dict[str, int]:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.getrange(key, 0, self._codec.HEADER.size - 1)
+            headers = await pipe.execute()
+        return {
+            key.decode().split(":", 1)[1]: self._codec.read_header(header)[2]
+            for key, header in zip(keys, headers)
+            if header
+        }
+
+    async def next_version(self) -> int:
+        return int(await self._redis.get(KNOWLEDGE_BASE_VERSION_KEY) or 0) + 1
+
+    async def save_answers(self, params: AnswersDataDm, version: int) -> None:
+        for uuids in _chunked(list(params.answers), self._chunk_size):
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for uuid in uuids:
+                    pipe.delete(f"answer:{uuid}")
+                    if params.answers[uuid]:
+                        pipe.rpush(f"answer:{uuid}", *params.answers[uuid])
+                pipe.mset({
+                    f"embedding:{uuid}": self._codec.encode(
+                        params.answers_embendings[uuid], version
+                    )
+                    for uuid in uuids
+                })
+                await pipe.execute()
+
+    async def commit_version(self, version: int, removed: set[str]) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for uuids in _chunked(removed, self._chunk_size):
+                pipe.delete(
+                    *(f"embedding:{uuid}" for uuid in uuids),
+                    *(f"answer:{uuid}" for uuid in uuids)
+                )
+            pipe.set(KNOWLEDGE_BASE_VERSION_KEY, version)
+            await pipe.execute()
+        self._rebuilds.inc()
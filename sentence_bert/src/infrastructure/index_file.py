@@ -0,0 +1,106 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from sentence_bert.src.application.interfaces import IndexFileStorage
+from sentence_bert.src.config import BertConfig
+from sentence_bert.src.domain.entities import EncodedAnswersDm
+from sentence_bert.src.domain.index import EmbeddingIndex, IvfIndex
+
+
+class IndexFileGateway(IndexFileStorage):
+    MAGIC = b"KBX1"
+    IVF_MAGIC = b"KBI1"
+    HEADER = struct.Struct("<4sIIIQ")
+    IVF_HEADER = struct.Struct("<IQ")
+    ALIGNMENT = 64
+
+    def __init__(self, config: BertConfig) -> None:
+        self._path = Path(config.index_path or Path(config.base_path).with_suffix(".index"))
+        self._config = config
+
+    def _align(self, offset: int) -> int:
+        return -(-offset // self.ALIGNMENT) * self.ALIGNMENT
+
+    def _matrix_offset(self) -> int:
+        return self._align(self.HEADER.size + self.IVF_HEADER.size)
+
+    def _build_ivf(self, index: EmbeddingIndex) -> IvfIndex:
+        previous = self.load_index_file()
+        return IvfIndex.from_index(
+            index,
+            nlist=self._config.ivf_nlist,
+            nprobe=self._config.ivf_nprobe,
+            iterations=self._config.ivf_train_iterations,
+            previous=previous.index if previous and isinstance(previous.index, IvfIndex) else None
+        )
+
+    def save_index_file(self, params: EncodedAnswersDm) -> None:
+        index = params.index
+        if self._config.index_mode == "ivf" and not isinstance(index, IvfIndex):
+            index = self._build_ivf(index)
+        matrix = np.ascontiguousarray(index.matrix, dtype="<f4")
+        keys = np.char.encode(index.keys.astype(str), "ascii")
+        width = max(keys.dtype.itemsize, 1)
+        magic = self.IVF_MAGIC if isinstance(index, IvfIndex) else self.MAGIC
+        header = self.HEADER.pack(magic, len(keys), matrix.shape[1], width, params.version)
+        if isinstance(index, IvfIndex):
+            header += self.IVF_HEADER.pack(len(index.centroids), index.trained_size)
+        temp_path = self._path.with_name(f".{self._path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as file:
+            file.write(header.ljust(self._matrix_offset(), b"\0"))
+            file.write(matrix.tobytes())
+            file.write(keys.astype(f"S{width}").tobytes())
+            if isinstance(index, IvfIndex):
+                file.write(b"\0" * (self._align(file.tell()) - file.tell()))
+                file.write(np.ascontiguousarray(index.centroids, dtype="<f4").tobytes())
+                file.write(np.ascontiguousarray(index.offsets, dtype="<i8").tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self._path)
+
+    def load_index_file(self) -> Optional[EncodedAnswersDm]:
+        try:
+            with open(self._path, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        magic, count, dim, width, version = self.HEADER.unpack_from(buffer)
+        if magic not in (self.MAGIC, self.IVF_MAGIC):
+            return None
+        matrix_offset = self._matrix_offset()
+        matrix = np.frombuffer(
+            buffer, dtype="<f4", count=count * dim, offset=matrix_offset
+        ).reshape(count, dim)
+        keys_offset = matrix_offset + matrix.nbytes
+        keys = np.frombuffer(
+            buffer, dtype=f"S{width}", count=count, offset=keys_offset
+        ).astype(str)
+        if magic == self.MAGIC or self._config.index_mode != "ivf":
+            return EncodedAnswersDm(
+                index=EmbeddingIndex(matrix=matrix, keys=keys),
+                version=version
+            )
+        nlist, trained_size = self.IVF_HEADER.unpack_from(buffer, self.HEADER.size)
+        centroids_offset = self._align(keys_offset + count * width)
+        centroids = np.frombuffer(
+            buffer, dtype="<f4", count=nlist * dim, offset=centroids_offset
+        ).reshape(nlist, dim)
+        offsets = np.frombuffer(
+            buffer, dtype="<i8", count=nlist + 1, offset=centroids_offset + centroids.nbytes
+        )
+        return EncodedAnswersDm(
+            index=IvfIndex(
+                matrix=matrix,
+                keys=keys,
+                centroids=centroids,
+                offsets=offsets,
+                nprobe=self._config.ivf_nprobe,
+                trained_size=trained_size
+            ),
+            version=version
+        )
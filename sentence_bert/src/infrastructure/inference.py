@@ -0,0 +1,155 @@
+import asyncio
+import threading
+from time import perf_counter
+from copy import deepcopy
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, PreTrainedTokenizerBase, T5EncoderModel
+from transformers.modeling_outputs import BaseModelOutput
+
+from sentence_bert.src.config import BertConfig
+from sentence_bert.src.infrastructure.backends import EncoderModel, export_onnx, load_encoder
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+
+
+_worker_model: Optional[EncoderModel] = None
+_worker_tokenizer: Optional[PreTrainedTokenizerBase] = None
+
+
+def l2_normalization(embeddings: torch.Tensor) -> torch.Tensor:
+    return embeddings / embeddings.norm(dim=1, keepdim=True)
+
+
+def mean_pooling(last_hidden_state: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    mask = attention_mask.unsqueeze(-1).to(last_hidden_state.dtype)
+    return (last_hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+
+
+def encode_texts(
+    model: EncoderModel,
+    tokenizer: PreTrainedTokenizerBase,
+    texts: list[str],
+    batch_size: int,
+    max_length: int,
+    timings: Optional[dict[str, float]] = None
+) -> np.ndarray:
+    if not texts:
+        return np.empty((0, model.config.d_model), dtype=np.float32)
+    tokenize_time = forward_time = 0.0
+    started = perf_counter()
+    tokens = tokenizer(texts, truncation=True, max_length=max_length)
+    order = sorted(range(len(texts)), key=lambda i: len(tokens["input_ids"][i]))
+    embeddings = np.empty((len(texts), model.config.d_model), dtype=np.float32)
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            inputs = tokenizer.pad(
+                {
+                    "input_ids": [tokens["input_ids"][i] for i in bucket],
+                    "attention_mask": [tokens["attention_mask"][i] for i in bucket],
+                },
+                return_tensors="pt"
+            )
+            padded = perf_counter()
+            tokenize_time += padded - started
+            output: BaseModelOutput = model(**inputs)
+            pooled = mean_pooling(output.last_hidden_state, inputs["attention_mask"])
+            embeddings[bucket] = l2_normalization(pooled).numpy()
+            started = perf_counter()
+            forward_time += started - padded
+    if timings is not None:
+        timings["tokenize"] = timings.get("tokenize", 0.0) + tokenize_time
+        timings["forward"] = timings.get("forward", 0.0) + forward_time
+    return embeddings
+
+
+def _init_worker(config: BertConfig) -> None:
+    global _worker_model, _worker_tokenizer
+    if config.inference_threads:
+        torch.set_num_threads(config.inference_threads)
+    model = T5EncoderModel.from_pretrained(config.model_name).eval()
+    _worker_model = load_encoder(config, model)
+    _worker_tokenizer = AutoTokenizer.from_pretrained(config.model_name, use_fast=True)
+
+
+def _encode_in_worker(
+    texts: list[str],
+    batch_size: int,
+    max_length: int
+) -> tuple[np.ndarray, dict[str, float]]:
+    timings: dict[str, float] = {}
+    embeddings = encode_texts(_worker_model, _worker_tokenizer, texts, batch_size, max_length, timings)
+    return embeddings, timings
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        config: BertConfig,
+        model: T5EncoderModel,
+        tokenizer: PreTrainedTokenizerBase,
+        metrics: MetricsRegistry,
+    ) -> None:
+        self._model: EncoderModel = model
+        self._tokenizer = tokenizer
+        self._batch_size = config.encode_batch_size
+        self._local = threading.local()
+        self._in_flight = asyncio.Semaphore(config.inference_max_in_flight)
+        self._stages = {
+            stage: metrics.stage(stage) for stage in ("inference_queue", "tokenize", "forward")
+        }
+        self._executor: Executor
+        if config.inference_executor == "process":
+            if config.encoder_backend == "onnx":
+                export_onnx(config, model)
+            self._executor = ProcessPoolExecutor(
+                max_workers=config.inference_workers,
+                initializer=_init_worker,
+                initargs=(config,)
+            )
+        else:
+            if config.inference_threads:
+                torch.set_num_threads(config.inference_threads)
+            self._model = load_encoder(config, model)
+            self._executor = ThreadPoolExecutor(
+                max_workers=config.inference_workers,
+                thread_name_prefix="inference"
+            )
+
+    async def encode(self, texts: list[str], max_length: int) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        queued = perf_counter()
+        async with self._in_flight:
+            if isinstance(self._executor, ProcessPoolExecutor):
+                self._stages["inference_queue"].observe(perf_counter() - queued)
+                embeddings, timings = await loop.run_in_executor(
+                    self._executor, _encode_in_worker, texts, self._batch_size, max_length
+                )
+            else:
+                embeddings, timings = await loop.run_in_executor(
+                    self._executor, self._encode_in_thread, texts, max_length, queued
+                )
+        for stage, seconds in timings.items():
+            self._stages[stage].observe(seconds)
+        return embeddings
+
+    def _encode_in_thread(
+        self,
+        texts: list[str],
+        max_length: int,
+        queued: float
+    ) -> tuple[np.ndarray, dict[str, float]]:
+        timings = {"inference_queue": perf_counter() - queued}
+        tokenizer = getattr(self._local, "tokenizer", None)
+        if tokenizer is None:
+            tokenizer = self._local.tokenizer = deepcopy(self._tokenizer)
+        embeddings = encode_texts(
+            self._model, tokenizer, texts, self._batch_size, max_length, timings
+        )
+        return embeddings, timings
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
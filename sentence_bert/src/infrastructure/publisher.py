@@ -0,0 +1,79 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from faststream.rabbit import RabbitBroker
+
+from sentence_bert.src.config import RabbitMQConfig
+
+
+@dataclass(slots=True)
+class _PendingPublish:
+    message: dict[str, Any]
+    exchange: str
+    routing_key: str
+    correlation_id: Optional[str]
+    future: asyncio.Future
+
+
+class BatchingPublisher:
+    """Publishes through the application's already connected broker.
+
+    Everything queued while the previous batch was in flight is sent as one
+    batch: the publishes are issued together on the broker channel, so their
+    confirms are pipelined instead of being awaited one round trip at a time.
+    """
+
+    def __init__(self, broker: RabbitBroker, config: RabbitMQConfig) -> None:
+        self._broker = broker
+        self._max_batch_size = config.publish_batch_size
+        self._queue: asyncio.Queue[_PendingPublish] = asyncio.Queue()
+        self._sender: Optional[asyncio.Task] = None
+
+    async def publish(
+        self,
+        message: dict[str, Any],
+        exchange: str,
+        routing_key: str,
+        correlation_id: Optional[str] = None
+    ) -> None:
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.create_task(self._send())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(
+            _PendingPublish(message, exchange, routing_key, correlation_id, future)
+        )
+        await future
+
+    async def close(self) -> None:
+        if self._sender is None:
+            return
+        if not self._sender.done():
+            await self._queue.join()
+        self._sender.cancel()
+        await asyncio.gather(self._sender, return_exceptions=True)
+
+    async def _send(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            results = await asyncio.gather(
+                *(
+                    self._broker.publish(
+                        pending.message,
+                        exchange=pending.exchange,
+                        routing_key=pending.routing_key,
+                        correlation_id=pending.correlation_id
+                    )
+                    for pending in batch
+                ),
+                return_exceptions=True
+            )
+            for pending, result in zip(batch, results):
+                if not pending.future.done():
+                    if isinstance(result, BaseException):
+                        pending.future.set_exception(result)
+                    else:
+                        pending.future.set_result(None)
+                self._queue.task_done()
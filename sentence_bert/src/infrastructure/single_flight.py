@@ -0,0 +1,81 @@
+import asyncio
+from contextlib import suppress
+from time import monotonic
+from typing import Awaitable, Callable, Optional
+
+from redis.asyncio import Redis
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError, LockNotOwnedError
+
+from sentence_bert.src.application.interfaces import KnowledgeBaseBuildLock
+from sentence_bert.src.config import BertConfig
+from sentence_bert.src.infrastructure.gateways import KNOWLEDGE_BASE_VERSION_KEY
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+
+
+BUILD_LOCK_KEY = "knowledge_base:build_lock"
+
+
+class SingleFlightBuildGateway(KnowledgeBaseBuildLock):
+    def __init__(self, redis: Redis, config: BertConfig, metrics: MetricsRegistry) -> None:
+        self._redis = redis
+        self._build_time = metrics.stage("knowledge_base_build")
+        self._lease = config.build_lock_lease
+        self._wait_timeout = config.build_wait_timeout
+        self._poll_interval = min(1.0, self._lease / 3)
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[Lock] = None
+        self._renewal: Optional[asyncio.Task] = None
+
+    async def run_once(self, build: Callable[[], Awaitable[None]]) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(build))
+        await asyncio.shield(self._task)
+
+    async def _run(self, build: Callable[[], Awaitable[None]]) -> None:
+        lock = self._lock = self._redis.lock(BUILD_LOCK_KEY, timeout=self._lease, thread_local=False)
+        version = await self._redis.get(KNOWLEDGE_BASE_VERSION_KEY)
+        deadline = monotonic() + self._wait_timeout
+        while not await lock.acquire(blocking=False):
+            # another worker is building: it is done once it commits a new version;
+            # if it gives up the lock without one, this worker builds instead
+            await asyncio.sleep(self._poll_interval)
+            if await self._redis.get(KNOWLEDGE_BASE_VERSION_KEY) != version:
+                return
+            if monotonic() >= deadline:
+                raise TimeoutError("Timed out waiting for the knowledge base build")
+        building = asyncio.ensure_future(build())
+        self._renewal = asyncio.create_task(self._renew(lock, building))
+        try:
+            with self._build_time.time():
+                await building
+        except asyncio.CancelledError:
+            if self._renewal.done() and not self._renewal.cancelled():
+                # the lease was lost: report why instead of a bare cancellation
+                self._renewal.result()
+            raise
+        finally:
+            building.cancel()
+            self._renewal.cancel()
+            await asyncio.gather(self._renewal, return_exceptions=True)
+            self._renewal = None
+            with suppress(LockError):
+                await lock.release()
+
+    async def ensure_held(self) -> None:
+        if self._renewal is None:
+            raise LockNotOwnedError("No knowledge base build is running")
+        if self._renewal.done():
+            self._renewal.result()
+        if not await self._lock.owned():
+            raise LockNotOwnedError("Lost the knowledge base build lock")
+
+    async def _renew(self, lock: Lock, building: asyncio.Future) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self._lease / 3)
+                await lock.reacquire()
+        except LockError:
+            # another worker may already hold the lock, so this build must not commit
+            building.cancel()
+            raise
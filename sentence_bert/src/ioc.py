@@ -1,42 +1,87 @@
-from typing import AsyncIterable
-from uuid import uuid4
+from typing import AsyncIterable, Iterable
 
 from dishka import Provider, Scope, provide, AnyOf, from_context
 from redis.asyncio import Redis
 from faststream.rabbit import RabbitBroker
+from transformers import PreTrainedTokenizerBase, T5EncoderModel
 
 from sentence_bert.src.application import interfaces
 from sentence_bert.src.application.interactors import (
     QuestionsHandlerInteractor,
     PrepareKnowledgeBaseInteractor
 )
-from sentence_bert.src.config import Config
+from sentence_bert.src.config import BertConfig, Config, RabbitMQConfig, RedisConfig
 from sentence_bert.src.infrastructure.gateways import (
+    EmbeddingsSnapshotGateway,
     KnowledgeBaseGateway,
     KnowledgeBasePrepareGateway
 )
-from sentence_bert.src.infrastructure.broker import new_broker
-from sentence_bert.src.infrastructure.cache import init_redis
+from sentence_bert.src.infrastructure.batching import QueryMicroBatcher
+from sentence_bert.src.infrastructure.index_file import IndexFileGateway
+from sentence_bert.src.infrastructure.inference import InferenceExecutor
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry, MetricsServer
+from sentence_bert.src.infrastructure.publisher import BatchingPublisher
+from sentence_bert.src.infrastructure.single_flight import SingleFlightBuildGateway
+from sentence_bert.src.infrastructure import factories
+from sentence_bert.src.infrastructure.cache import (
+    QueryEmbeddingCache,
+    SemanticAnswerCache,
+    init_redis,
+    observe_redis_pool
+)
 
 
 class AppProvider(Provider):
     config = from_context(provides=Config, scope=Scope.APP)
+    broker = from_context(provides=RabbitBroker, scope=Scope.APP)
+
+    @provide(scope=Scope.APP)
+    def get_bert_config(self, config: Config) -> BertConfig:
+        return config.bert
 
     @provide(scope=Scope.APP)
-    def get_uuid_generator(self) -> interfaces.UUIDGenerator:
-        return uuid4
+    def get_redis_config(self, config: Config) -> RedisConfig:
+        return config.redis
 
     @provide(scope=Scope.APP)
-    async def get_redis(self, config: Config) -> AsyncIterable[Redis]:
+    def get_rabbitmq_config(self, config: Config) -> RabbitMQConfig:
+        return config.rabbitmq
+
+    @provide(scope=Scope.APP)
+    async def get_redis(self, config: Config, metrics: MetricsRegistry) -> AsyncIterable[Redis]:
         redis = init_redis(config.redis)
+        observe_redis_pool(redis, metrics)
         try:
             yield redis
         finally:
             await redis.aclose()
 
     @provide(scope=Scope.APP)
-    def get_broker(self, config: Config) -> RabbitBroker:
-        return new_broker(config.rabbitmq)
+    async def get_publisher(
+        self,
+        broker: RabbitBroker,
+        config: RabbitMQConfig
+    ) -> AsyncIterable[BatchingPublisher]:
+        publisher = BatchingPublisher(broker, config)
+        try:
+            yield publisher
+        finally:
+            await publisher.close()
+
+    metrics = provide(MetricsRegistry, scope=Scope.APP)
+
+    @provide(scope=Scope.APP)
+    async def get_metrics_server(
+        self,
+        registry: MetricsRegistry,
+        config: BertConfig
+    ) -> AsyncIterable[MetricsServer]:
+        server = MetricsServer(registry, config)
+        await server.start()
+        try:
+            yield server
+        finally:
+            await server.close()
 
     prepare_gateway = provide(
         KnowledgeBasePrepareGateway,
@@ -51,15 +96,99 @@ class AppProvider(Provider):
 
     question_handler_gateway = provide(
         KnowledgeBaseGateway,
-        scope=Scope.REQUEST,
+        scope=Scope.APP,
         provides=AnyOf[
-            interfaces.KnowledgeBaseService,
+            interfaces.BatchKnowledgeBaseService,
             interfaces.EmbendingNormalization,
             interfaces.EmbendingEncoder,
             interfaces.ResultSender,
-            interfaces.CacheEmbendingsGetter
+        ]
+    )
+
+    @provide(scope=Scope.APP)
+    async def get_model(self, config: BertConfig) -> T5EncoderModel:
+        return await factories.get_model(config)
+
+    @provide(scope=Scope.APP)
+    async def get_tokenizer(self, config: BertConfig) -> PreTrainedTokenizerBase:
+        return await factories.get_tokenizer(config)
+
+    @provide(scope=Scope.APP)
+    def get_inference_executor(
+        self,
+        config: BertConfig,
+        model: T5EncoderModel,
+        tokenizer: PreTrainedTokenizerBase,
+        metrics: MetricsRegistry
+    ) -> Iterable[InferenceExecutor]:
+        executor = InferenceExecutor(config, model, tokenizer, metrics)
+        try:
+            yield executor
+        finally:
+            executor.shutdown()
+
+    @provide(scope=Scope.APP)
+    async def get_query_batcher(
+        self,
+        service: interfaces.BatchKnowledgeBaseService,
+        config: BertConfig,
+        metrics: MetricsRegistry
+    ) -> AsyncIterable[interfaces.KnowledgeBaseService]:
+        batcher = QueryMicroBatcher(service, config, metrics)
+        try:
+            yield batcher
+        finally:
+            await batcher.close()
+
+    query_cache = provide(
+        QueryEmbeddingCache,
+        scope=Scope.APP,
+        provides=interfaces.QueryEmbeddingsCache
+    )
+
+    answer_cache = provide(
+        SemanticAnswerCache,
+        scope=Scope.APP,
+        provides=interfaces.SemanticAnswersCache
+    )
+
+    index_file_gateway = provide(
+        IndexFileGateway,
+        scope=Scope.APP,
+        provides=interfaces.IndexFileStorage
+    )
+
+    build_lock = provide(
+        SingleFlightBuildGateway,
+        scope=Scope.APP,
+        provides=interfaces.KnowledgeBaseBuildLock
+    )
+
+    snapshot_gateway = provide(
+        EmbeddingsSnapshotGateway,
+        scope=Scope.APP,
+        provides=AnyOf[
+            interfaces.CacheEmbendingsGetter,
+            interfaces.EmbeddingsSnapshot
         ]
     )
 
     base_prepare_interactor = provide(PrepareKnowledgeBaseInteractor, scope=Scope.REQUEST)
-    question_handler_interactor = provide(QuestionsHandlerInteractor, scope=Scope.REQUEST)
\ No newline at end of file
+    question_handler_interactor = provide(QuestionsHandlerInteractor, scope=Scope.REQUEST)
+
+class PreloadedModelProvider(Provider):
+    """Serves a model and tokenizer loaded before the container exists, so
+    that forked pool workers reuse the parent's copy-on-write weights."""
+
+    def __init__(self, model: T5EncoderModel, tokenizer: PreTrainedTokenizerBase) -> None:
+        super().__init__()
+        self._model = model
+        self._tokenizer = tokenizer
+
+    @provide(scope=Scope.APP)
+    def get_model(self) -> T5EncoderModel:
+        return self._model
+
+    @provide(scope=Scope.APP)
+    def get_tokenizer(self) -> PreTrainedTokenizerBase:
+        return self._tokenizer
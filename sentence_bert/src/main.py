@@ -1,25 +1,61 @@
-from dishka import make_async_container
+import asyncio
+import logging
+from functools import partial
+from pathlib import Path
+
+from dishka import AsyncContainer, Provider, make_async_container
 from dishka.integrations import faststream as faststream_integration
 from faststream import FastStream
+from faststream.rabbit import RabbitBroker
 
+from sentence_bert.src.application.interfaces import EmbeddingsSnapshot, KnowledgeBaseService
 from sentence_bert.src.config import Config
 from sentence_bert.src.controllers.ampq import TasksController
 from sentence_bert.src.infrastructure.broker import new_broker
+from sentence_bert.src.infrastructure.inference import InferenceExecutor
+from sentence_bert.src.infrastructure.metrics import MetricsServer
 from sentence_bert.src.ioc import AppProvider
 
 
-config = Config()
-container = make_async_container(AppProvider(), context={Config: config})
+logger = logging.getLogger(__name__)
+
+def get_container(config: Config, broker: RabbitBroker, *providers: Provider) -> AsyncContainer:
+    return make_async_container(
+        AppProvider(), *providers, context={Config: config, RabbitBroker: broker}
+    )
+
 
+async def warm_up(config: Config, container: AsyncContainer) -> None:
+    await container.get(MetricsServer)
+    executor = await container.get(InferenceExecutor)
+    await asyncio.gather(*(
+        executor.encode([config.bert.query_instruction], config.bert.query_max_length)
+        for _ in range(config.bert.inference_workers)
+    ))
+    await container.get(KnowledgeBaseService)
+    snapshot = await container.get(EmbeddingsSnapshot)
+    await snapshot.get_snapshot()
+    if config.bert.ready_file:
+        Path(config.bert.ready_file).touch()
+    logger.info("sentence_bert worker is ready")
 
-def get_faststream_app() -> FastStream:
-    broker = new_broker(config.rabbitmq)
+
+async def mark_not_ready(config: Config) -> None:
+    if config.bert.ready_file:
+        Path(config.bert.ready_file).unlink(missing_ok=True)
+
+
+def get_faststream_app(config: Config, broker: RabbitBroker, container: AsyncContainer) -> FastStream:
     app = FastStream(broker)
     faststream_integration.setup_dishka(container, app, auto_inject=True)
     broker.include_router(TasksController)
+    app.on_startup(partial(warm_up, config, container))
+    app.on_shutdown(partial(mark_not_ready, config))
     return app
 
-app = get_faststream_app()
+config = Config()
+broker = new_broker(config.rabbitmq)
+app = get_faststream_app(config, broker, get_container(config, broker))
 
 if __name__ == "__main__":
     import uvicorn
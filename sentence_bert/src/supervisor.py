@@ -0,0 +1,141 @@
+"""Pre-fork consumer pool.
+
+The parent loads the model and tokenizer once, freezes the GC so that
+forked children do not dirty the shared pages, then forks BERT_POOL_WORKERS
+FastStream consumers and restarts any that die:
+
+    python -m sentence_bert.src.supervisor
+
+Only the torch and int8 backends share their weights this way. ONNX Runtime
+sessions are not fork-safe, so with BERT_ENCODER_BACKEND=onnx the parent just
+exports the model and every child builds its own session after the fork: each
+worker holds a private copy of the weights and the pool gets no memory saving.
+"""
+import asyncio
+import gc
+import logging
+import os
+import signal
+import time
+from typing import Optional
+
+import torch
+from transformers import PreTrainedTokenizerBase, T5EncoderModel
+
+from sentence_bert.src.config import BertConfig, Config
+from sentence_bert.src.infrastructure import factories
+from sentence_bert.src.infrastructure.backends import export_onnx, load_encoder
+from sentence_bert.src.infrastructure.broker import new_broker
+from sentence_bert.src.ioc import PreloadedModelProvider
+
+
+logger = logging.getLogger(__name__)
+
+
+def worker_threads(config: BertConfig) -> int:
+    return config.inference_threads or max((os.cpu_count() or 1) // config.pool_workers, 1)
+
+
+def load_shared_model(config: BertConfig) -> tuple[T5EncoderModel, PreTrainedTokenizerBase]:
+    model = asyncio.run(factories.get_model(config))
+    tokenizer = asyncio.run(factories.get_tokenizer(config))
+    if config.encoder_backend == "int8":
+        load_encoder(config, model)
+    elif config.encoder_backend == "onnx":
+        export_onnx(config, model)
+        if config.pool_workers > 1:
+            logger.warning(
+                "ONNX Runtime sessions are created after the fork: each of the %s pool "
+                "workers keeps its own copy of the model weights",
+                config.pool_workers
+            )
+    gc.collect()
+    gc.freeze()
+    return model, tokenizer
+
+
+def _run_worker(config: Config, model: T5EncoderModel, tokenizer: PreTrainedTokenizerBase) -> None:
+    # main builds its own app from the environment on import, so only pull it
+    # in where the environment is known to be complete
+    from sentence_bert.src.main import get_container, get_faststream_app
+
+    torch.set_num_threads(config.bert.inference_threads)
+    broker = new_broker(config.rabbitmq)
+    container = get_container(config, broker, PreloadedModelProvider(model, tokenizer))
+    asyncio.run(get_faststream_app(config, broker, container).run())
+
+
+class WorkerPool:
+    def __init__(self, config: Config) -> None:
+        threads = worker_threads(config.bert)
+        self._config = config.model_copy(update={
+            "bert": config.bert.model_copy(update={
+                "inference_executor": "thread",
+                "inference_threads": threads,
+            })
+        })
+        self._size = config.bert.pool_workers
+        self._restart_delay = config.bert.pool_restart_delay
+        self._workers: dict[int, int] = {}
+        self._stopping = False
+        self._model: Optional[T5EncoderModel] = None
+        self._tokenizer: Optional[PreTrainedTokenizerBase] = None
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                _run_worker(self._worker_config(slot), self._model, self._tokenizer)
+            except BaseException:
+                logger.exception("pool worker %s crashed", slot)
+                code = 1
+            finally:
+                os._exit(code)
+        self._workers[pid] = slot
+        logger.info("started pool worker %s (pid %s)", slot, pid)
+
+    def _worker_config(self, slot: int) -> Config:
+        port = self._config.bert.metrics_port
+        if port is None:
+            return self._config
+        return self._config.model_copy(update={
+            "bert": self._config.bert.model_copy(update={"metrics_port": port + slot})
+        })
+
+    def _stop(self, signum: int, _frame) -> None:
+        self._stopping = True
+        for pid in self._workers:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        self._model, self._tokenizer = load_shared_model(self._config.bert)
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for slot in range(self._size):
+            self._spawn(slot)
+        while self._workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            slot = self._workers.pop(pid, None)
+            if slot is None or self._stopping:
+                continue
+            logger.warning(
+                "pool worker %s (pid %s) exited with status %s, restarting",
+                slot, pid, os.waitstatus_to_exitcode(status)
+            )
+            time.sleep(self._restart_delay)
+            if not self._stopping:
+                self._spawn(slot)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    WorkerPool(Config()).run()
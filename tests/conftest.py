@@ -0,0 +1,35 @@
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from sentence_bert.src.config import BertConfig, RedisConfig
+
+
+@pytest.fixture
+def make_bert_config(tmp_path: Path) -> Callable[..., BertConfig]:
+    def make(**overrides: Any) -> BertConfig:
+        values = {
+            "BERT_BASE_PATH": str(tmp_path / "knowledge_base.csv"),
+            "BERT_MODEL_NAME": "tiny-t5",
+            "BERT_THRESHOLD": 0.5,
+            "BERT_QUERY_INSTRUCTION": "word1",
+            "BERT_DOCUMENT_INSTRUCTION": "word2",
+            "BERT_INDEX_PATH": str(tmp_path / "knowledge_base.index"),
+        }
+        values.update(overrides)
+        return BertConfig(**values)
+
+    return make
+
+
+@pytest.fixture
+def redis_config() -> RedisConfig:
+    return RedisConfig(REDIS_HOST="", REDIS_PORT=0, REDIS_PASSWORD="", REDIS_DB=0, REDIS_CHUNK_SIZE=7)
+
+
+@pytest.fixture
+def redis():
+    from fakeredis import FakeAsyncRedis
+
+    return FakeAsyncRedis()
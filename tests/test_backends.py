@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from sentence_bert.benchmarks.fixtures import synthetic_texts, tiny_model, tiny_tokenizer
+from sentence_bert.src.domain.index import EmbeddingIndex
+from sentence_bert.src.infrastructure.backends import OnnxEncoder, load_encoder, onnx_path
+from sentence_bert.src.infrastructure.inference import encode_texts
+
+
+MAX_LENGTH = 64
+MIN_COSINE = {"int8": 0.98, "onnx": 0.9999}
+# int8 rounding may flip near-ties between answers of the random test model
+MIN_TOP_1_AGREEMENT = {"int8": 0.9, "onnx": 1.0}
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    return tiny_tokenizer()
+
+
+@pytest.fixture(scope="module")
+def documents():
+    return synthetic_texts(60, 10, 60, seed=5)
+
+
+@pytest.fixture(scope="module")
+def queries(documents):
+    return [" ".join(document.split()[2:10]) for document in documents[::3]]
+
+
+def encode(encoder, tokenizer, documents, queries):
+    return (
+        encode_texts(encoder, tokenizer, documents, 16, MAX_LENGTH),
+        encode_texts(encoder, tokenizer, queries, 16, MAX_LENGTH),
+    )
+
+
+@pytest.fixture(scope="module")
+def reference(tokenizer, documents, queries):
+    return encode(tiny_model(d_model=32), tokenizer, documents, queries)
+
+
+@pytest.mark.parametrize("backend", ["int8", "onnx"])
+def test_backend_matches_torch(make_bert_config, tokenizer, documents, queries, reference, backend: str) -> None:
+    if backend == "onnx":
+        pytest.importorskip("onnxruntime")
+    config = make_bert_config(BERT_ENCODER_BACKEND=backend)
+    encoder = load_encoder(config, tiny_model(d_model=32))
+    assert isinstance(encoder, OnnxEncoder) == (backend == "onnx")
+    document_embeddings, query_embeddings = encode(encoder, tokenizer, documents, queries)
+    reference_documents, reference_queries = reference
+    cosine = min(
+        (document_embeddings * reference_documents).sum(axis=1).min(),
+        (query_embeddings * reference_queries).sum(axis=1).min(),
+    )
+    assert cosine >= MIN_COSINE[backend]
+    keys = np.arange(len(documents)).astype(str)
+    top_1 = [hits[0][0] for hits in EmbeddingIndex.build(keys, document_embeddings).top_k_batch(query_embeddings)]
+    expected = [hits[0][0] for hits in EmbeddingIndex.build(keys, reference_documents).top_k_batch(reference_queries)]
+    assert np.mean([a == b for a, b in zip(top_1, expected)]) >= MIN_TOP_1_AGREEMENT[backend]
+
+
+def test_onnx_export_is_reused(make_bert_config) -> None:
+    pytest.importorskip("onnxruntime")
+    config = make_bert_config(BERT_ENCODER_BACKEND="onnx")
+    load_encoder(config, tiny_model(d_model=32))
+    exported = onnx_path(config).stat().st_mtime_ns
+    load_encoder(config, tiny_model(d_model=32))
+    assert onnx_path(config).stat().st_mtime_ns == exported
@@ -0,0 +1,47 @@
+import asyncio
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeConnection
+from redis.asyncio import Redis
+
+from sentence_bert.src.infrastructure.cache import ObservedConnectionPool, observe_redis_pool
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+
+
+def pool_gauges(metrics: MetricsRegistry) -> list[str]:
+    return [line for line in metrics.render().splitlines() if "redis_pool" in line and not line.startswith("#")]
+
+
+def test_pool_gauges_follow_checkouts() -> None:
+    pool = ObservedConnectionPool(max_connections=4, connection_class=FakeConnection, server=FakeServer())
+    redis = Redis.from_pool(pool)
+    metrics = MetricsRegistry()
+    observe_redis_pool(redis, metrics)
+
+    async def run() -> list[list[str]]:
+        await redis.set("key", 1)
+        idle = pool_gauges(metrics)
+        connections = [await pool.get_connection() for _ in range(2)]
+        busy = pool_gauges(metrics)
+        for connection in connections:
+            await pool.release(connection)
+        released = pool_gauges(metrics)
+        await redis.aclose()
+        return [idle, busy, released]
+
+    idle, busy, released = asyncio.run(run())
+    assert idle == [
+        'sentence_bert_redis_pool_connections{state="in_use"} 0',
+        'sentence_bert_redis_pool_connections{state="idle"} 1',
+        "sentence_bert_redis_pool_utilization 0.0",
+    ]
+    assert busy == [
+        'sentence_bert_redis_pool_connections{state="in_use"} 2',
+        'sentence_bert_redis_pool_connections{state="idle"} 0',
+        "sentence_bert_redis_pool_utilization 0.5",
+    ]
+    assert released == [
+        'sentence_bert_redis_pool_connections{state="in_use"} 0',
+        'sentence_bert_redis_pool_connections{state="idle"} 2',
+        "sentence_bert_redis_pool_utilization 0.0",
+    ]
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from sentence_bert.benchmarks.fixtures import random_vectors
+from sentence_bert.src.infrastructure.codec import EmbeddingCodec
+
+
+@pytest.mark.parametrize(("dtype", "atol"), [("float32", 0), ("float16", 1e-3)])
+def test_round_trip(dtype: str, atol: float) -> None:
+    codec = EmbeddingCodec(dtype)
+    vectors = random_vectors(5, 48, seed=1)
+    blobs = [codec.encode(vector, 7) for vector in vectors]
+    assert all(len(blob) == codec.HEADER.size + 48 * np.dtype(dtype).itemsize for blob in blobs)
+    np.testing.assert_allclose(codec.decode(blobs[0]), vectors[0], atol=atol)
+    np.testing.assert_allclose(codec.decode_many(blobs), vectors, atol=atol)
+
+
+def test_header_carries_dimension_dtype_and_version() -> None:
+    codec = EmbeddingCodec("float16")
+    dim, dtype, version = codec.read_header(codec.encode(np.zeros(12), 2**40))
+    assert (dim, dtype, version) == (12, np.dtype("<f2"), 2**40)
+
+
+def test_rows_are_decoded_with_their_own_dtype() -> None:
+    vector = random_vectors(1, 8)[0]
+    blob = EmbeddingCodec("float16").encode(vector, 1)
+    np.testing.assert_allclose(EmbeddingCodec("float32").decode(blob), vector, atol=1e-3)
+
+
+def test_decode_is_zero_copy() -> None:
+    codec = EmbeddingCodec()
+    blob = codec.encode(random_vectors(1, 8)[0], 1)
+    assert not codec.decode(blob).flags.owndata
+
+
+@pytest.mark.parametrize(
+    "blob",
+    [
+        b"EMB2" + EmbeddingCodec().encode(np.zeros(4), 1)[4:],
+        EmbeddingCodec.HEADER.pack(b"EMB1", 9, 4, 1) + bytes(16),
+    ],
+    ids=["magic", "dtype"],
+)
+def test_unknown_header_is_rejected(blob: bytes) -> None:
+    with pytest.raises(ValueError):
+        EmbeddingCodec().decode(blob)
+
+
+def test_no_blobs_decode_to_an_empty_matrix() -> None:
+    assert EmbeddingCodec().decode_many([]).shape == (0, 0)
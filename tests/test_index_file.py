@@ -0,0 +1,117 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from sentence_bert.benchmarks.fixtures import random_vectors
+from sentence_bert.src.domain.entities import EncodedAnswersDm
+from sentence_bert.src.domain.index import EmbeddingIndex, IvfIndex
+from sentence_bert.src.infrastructure.codec import EmbeddingCodec
+from sentence_bert.src.infrastructure.gateways import KNOWLEDGE_BASE_VERSION_KEY, EmbeddingsSnapshotGateway
+from sentence_bert.src.infrastructure.index_file import IndexFileGateway
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+
+
+def make_index(size: int = 50, dim: int = 16, seed: int = 0) -> EmbeddingIndex:
+    return EmbeddingIndex.build([f"answer-{seed}-{i}" for i in range(size)], random_vectors(size, dim, seed))
+
+
+def test_exact_index_round_trip(make_bert_config) -> None:
+    gateway = IndexFileGateway(make_bert_config())
+    index = make_index()
+    gateway.save_index_file(EncodedAnswersDm(index=index, version=3))
+    with open(make_bert_config().index_path, "rb") as file:
+        assert file.read(4) == IndexFileGateway.MAGIC
+    loaded = gateway.load_index_file()
+    assert loaded.version == 3 and type(loaded.index) is EmbeddingIndex
+    np.testing.assert_array_equal(loaded.index.matrix, index.matrix)
+    np.testing.assert_array_equal(loaded.index.keys, index.keys)
+
+
+def test_ivf_index_round_trip(make_bert_config) -> None:
+    config = make_bert_config(BERT_INDEX_MODE="ivf", BERT_IVF_NLIST=4, BERT_IVF_NPROBE=2)
+    gateway = IndexFileGateway(config)
+    index = make_index()
+    gateway.save_index_file(EncodedAnswersDm(index=index, version=5))
+    with open(config.index_path, "rb") as file:
+        assert file.read(4) == IndexFileGateway.IVF_MAGIC
+    loaded = gateway.load_index_file()
+    assert loaded.version == 5 and isinstance(loaded.index, IvfIndex)
+    assert loaded.index.nprobe == 2 and len(loaded.index.centroids) == 4
+    assert sorted(loaded.index.keys) == sorted(index.keys)
+    assert loaded.index.offsets[-1] == len(index)
+    queries = index.matrix[:10]
+    assert [hits[0][0] for hits in loaded.index.with_nprobe(4).top_k_batch(queries)] == list(index.keys[:10])
+
+
+def test_ivf_file_loads_as_exact_index_in_exact_mode(make_bert_config) -> None:
+    ivf = make_bert_config(BERT_INDEX_MODE="ivf", BERT_IVF_NLIST=4)
+    IndexFileGateway(ivf).save_index_file(EncodedAnswersDm(index=make_index(), version=1))
+    loaded = IndexFileGateway(make_bert_config()).load_index_file()
+    assert type(loaded.index) is EmbeddingIndex and len(loaded.index) == 50
+
+
+def test_missing_or_foreign_file_is_ignored(make_bert_config) -> None:
+    config = make_bert_config()
+    gateway = IndexFileGateway(config)
+    assert gateway.load_index_file() is None
+    with open(config.index_path, "wb") as file:
+        file.write(b"NOPE" + bytes(200))
+    assert gateway.load_index_file() is None
+
+
+async def store_rows(redis, index: EmbeddingIndex, version: int) -> None:
+    codec = EmbeddingCodec()
+    await redis.mset({f"embedding:{key}": codec.encode(row, version) for key, row in zip(index.keys, index.matrix)})
+    await redis.set(KNOWLEDGE_BASE_VERSION_KEY, version)
+
+
+def make_snapshot_gateway(redis, config, redis_config) -> EmbeddingsSnapshotGateway:
+    return EmbeddingsSnapshotGateway(redis, config, redis_config, IndexFileGateway(config), MetricsRegistry())
+
+
+def test_snapshot_prefers_a_current_index_file(make_bert_config, redis_config, redis) -> None:
+    config = make_bert_config()
+    stored, on_disk = make_index(seed=1), make_index(seed=2)
+    IndexFileGateway(config).save_index_file(EncodedAnswersDm(index=on_disk, version=2))
+    asyncio.run(store_rows(redis, stored, 2))
+    snapshot = asyncio.run(make_snapshot_gateway(redis, config, redis_config).get_snapshot())
+    assert snapshot.version == 2
+    assert list(snapshot.index.keys) == list(on_disk.keys)
+
+
+def test_snapshot_falls_back_to_redis_when_the_file_is_stale(make_bert_config, redis_config, redis) -> None:
+    config = make_bert_config()
+    stored, on_disk = make_index(seed=1), make_index(seed=2)
+    IndexFileGateway(config).save_index_file(EncodedAnswersDm(index=on_disk, version=1))
+    asyncio.run(store_rows(redis, stored, 2))
+    snapshot = asyncio.run(make_snapshot_gateway(redis, config, redis_config).get_snapshot())
+    assert snapshot.version == 2
+    assert sorted(snapshot.index.keys) == sorted(stored.keys)
+
+
+@pytest.mark.parametrize("with_file", [False, True])
+def test_snapshot_is_empty_without_a_committed_version(make_bert_config, redis_config, redis, with_file: bool) -> None:
+    config = make_bert_config()
+    if with_file:
+        IndexFileGateway(config).save_index_file(EncodedAnswersDm(index=make_index(), version=1))
+    assert asyncio.run(make_snapshot_gateway(redis, config, redis_config).get_snapshot()) is None
+
+
+def test_empty_version_is_cached_until_the_next_refresh(make_bert_config, redis_config, redis) -> None:
+    gateway = make_snapshot_gateway(redis, make_bert_config(BERT_SNAPSHOT_REFRESH_INTERVAL=60), redis_config)
+    scans = []
+    scan = gateway.get_all_embeddings_scan
+
+    async def counting_scan():
+        scans.append(1)
+        return await scan()
+
+    gateway.get_all_embeddings_scan = counting_scan
+
+    async def run() -> list:
+        await redis.set(KNOWLEDGE_BASE_VERSION_KEY, 1)
+        return [await gateway.get_snapshot() for _ in range(3)]
+
+    assert asyncio.run(run()) == [None] * 3
+    assert len(scans) == 1
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import torch
+
+from sentence_bert.benchmarks.fixtures import synthetic_texts, tiny_model, tiny_tokenizer
+from sentence_bert.src.infrastructure.inference import encode_texts, l2_normalization
+
+
+MAX_LENGTH = 64
+
+
+@pytest.fixture(scope="module")
+def model():
+    return tiny_model(d_model=32)
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    return tiny_tokenizer()
+
+
+@pytest.fixture(scope="module")
+def texts():
+    return synthetic_texts(40, 1, 80, seed=3)
+
+
+def encode_unpadded(model, tokenizer, text: str) -> np.ndarray:
+    inputs = tokenizer(text, truncation=True, max_length=MAX_LENGTH, return_tensors="pt")
+    with torch.inference_mode():
+        hidden = model(**inputs).last_hidden_state
+    return l2_normalization(hidden.mean(dim=1)).numpy()[0]
+
+
+@pytest.mark.parametrize("batch_size", [2, 7, 40])
+def test_batched_encoding_matches_per_item(model, tokenizer, texts, batch_size: int) -> None:
+    per_item = encode_texts(model, tokenizer, texts, 1, MAX_LENGTH)
+    batched = encode_texts(model, tokenizer, texts, batch_size, MAX_LENGTH)
+    np.testing.assert_allclose(batched, per_item, atol=1e-5)
+
+
+def test_padding_does_not_change_embeddings(model, tokenizer, texts) -> None:
+    batched = encode_texts(model, tokenizer, texts, 16, MAX_LENGTH)
+    unpadded = np.stack([encode_unpadded(model, tokenizer, text) for text in texts])
+    np.testing.assert_allclose(batched, unpadded, atol=1e-5)
+
+
+def test_embeddings_keep_input_order_and_unit_norm(model, tokenizer, texts) -> None:
+    embeddings = encode_texts(model, tokenizer, texts, 8, MAX_LENGTH)
+    reversed_embeddings = encode_texts(model, tokenizer, texts[::-1], 8, MAX_LENGTH)
+    np.testing.assert_allclose(reversed_embeddings[::-1], embeddings, atol=1e-5)
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1, atol=1e-5)
+
+
+def test_no_texts_give_an_empty_matrix(model, tokenizer) -> None:
+    assert encode_texts(model, tokenizer, [], 8, MAX_LENGTH).shape == (0, model.config.d_model)
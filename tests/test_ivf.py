@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from sentence_bert.benchmarks.ann import make_vectors
+from sentence_bert.src.domain.index import EmbeddingIndex, IvfIndex
+
+
+SIZE = 5_000
+DIM = 64
+
+
+@pytest.fixture(scope="module")
+def exact() -> EmbeddingIndex:
+    rng = np.random.default_rng(0)
+    return EmbeddingIndex.build(np.arange(SIZE).astype(str), make_vectors(SIZE, DIM, rng))
+
+
+@pytest.fixture(scope="module")
+def queries(exact: EmbeddingIndex) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    rows = rng.integers(SIZE, size=300)
+    noisy = exact.matrix[rows] + rng.standard_normal((len(rows), DIM), dtype=np.float32) / np.sqrt(DIM)
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+
+def recall(index: EmbeddingIndex, exact: EmbeddingIndex, queries: np.ndarray) -> float:
+    found = [hits[0][0] for hits in index.top_k_batch(queries, 1)]
+    expected = [hits[0][0] for hits in exact.top_k_batch(queries, 1)]
+    return float(np.mean([a == b for a, b in zip(found, expected)]))
+
+
+@pytest.mark.parametrize(("nprobe", "min_recall"), [(8, 0.9), (32, 0.98)])
+def test_recall_against_exact_search(exact, queries, nprobe: int, min_recall: float) -> None:
+    ivf = IvfIndex.from_index(exact, nlist=64, nprobe=nprobe, iterations=10)
+    assert recall(ivf, exact, queries) >= min_recall
+
+
+def test_probing_every_list_is_exact(exact, queries) -> None:
+    ivf = IvfIndex.from_index(exact, nlist=16, nprobe=16, iterations=5)
+    assert recall(ivf, exact, queries) == 1.0
+    assert [key for key, _ in ivf.top_k(queries[0], 5)] == [key for key, _ in exact.top_k(queries[0], 5)]
+
+
+def test_incremental_rebuild_keeps_centroids_and_recall(exact, queries) -> None:
+    ivf = IvfIndex.from_index(exact, nlist=64, nprobe=16, iterations=10)
+    rng = np.random.default_rng(2)
+    grown = EmbeddingIndex.build(
+        np.concatenate([exact.keys, np.arange(SIZE, SIZE + SIZE // 10).astype(str)]),
+        np.concatenate([exact.matrix, make_vectors(SIZE // 10, DIM, rng)])
+    )
+    rebuilt = IvfIndex.from_index(grown, nlist=64, nprobe=16, iterations=10, previous=ivf)
+    assert rebuilt.centroids is ivf.centroids and rebuilt.trained_size == SIZE
+    assert sorted(rebuilt.keys) == sorted(grown.keys)
+    assert recall(rebuilt, EmbeddingIndex.build(grown.keys, grown.matrix), queries) >= 0.95
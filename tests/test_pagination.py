@@ -0,0 +1,185 @@
+import random
+import re
+from html import unescape
+
+import pytest
+
+from common.pagination import Paginator, normalize_parse_mode, utf16_length
+
+
+SEEDS = range(300)
+WORDS = ("word", "слово", "é", "👍🏽", "🇷🇺", "👨‍👩‍👧", "end.", "ok!", "&amp;", "a,b")
+SPACES = (" ", "  ", "\t", "\n", "\n\n", "   \n  ")
+HTML_TAGS = ("b", "i", "code", "pre")
+HTML_TAG = re.compile(r"<(/?)([a-z]+)[^>]*>")
+# entity delimiters, verbatim ones last, and the escapes each Markdown flavour accepts
+MARKDOWN_ENTITIES = {
+    "Markdown": ("*", "_", "`", "```\n"),
+    "MarkdownV2": ("*", "_", "__", "~", "||", "`", "```\n"),
+}
+MARKDOWN_ESCAPES = {
+    "Markdown": ("\\*", "\\_", "\\`", "\\["),
+    "MarkdownV2": ("\\*", "\\_", "\\.", "\\!", "\\\\", "\\`", "\\|"),
+}
+MARKDOWN_MARKUP = {
+    "Markdown": re.compile(r"\\([_*`\[])|```\n?|[*_`]"),
+    "MarkdownV2": re.compile(r"\\(.)|```\n?|\|\||__|[*_~`]", re.DOTALL),
+}
+MARKDOWN_ESCAPE = {
+    "Markdown": re.compile(r"\\[_*`\[]"),
+    "MarkdownV2": re.compile(r"\\.", re.DOTALL),
+}
+
+
+def markdown_word(rng: random.Random, parse_mode: str) -> str:
+    word = rng.choice(WORDS[:-2])
+    if parse_mode == "MarkdownV2":
+        word = re.sub(r"([.!])", r"\\\1", word)
+    if rng.random() < 0.15:
+        word += rng.choice(MARKDOWN_ESCAPES[parse_mode])
+    return word
+
+
+def random_text(rng: random.Random, parse_mode: str | None = None) -> str:
+    parts = [rng.choice(SPACES) if rng.random() < 0.3 else ""]
+    for _ in range(rng.randint(0, 60)):
+        if parse_mode in MARKDOWN_ENTITIES:
+            word = markdown_word(rng, parse_mode)
+        else:
+            word = rng.choice(WORDS if parse_mode == "HTML" else WORDS[:-2])
+        if parse_mode == "HTML" and rng.random() < 0.15:
+            tag = rng.choice(HTML_TAGS)
+            inner = rng.choice(SPACES) * rng.randint(0, 3) + word + rng.choice(SPACES)
+            word = f"<{tag}>{inner}</{tag}>"
+        elif parse_mode in MARKDOWN_ENTITIES and rng.random() < 0.15:
+            opening = rng.choice(MARKDOWN_ENTITIES[parse_mode])
+            if opening.startswith("`"):
+                # markup and escapes are literal inside code
+                word = rng.choice(WORDS[:-2])
+            inner = rng.choice(SPACES) * rng.randint(0, 3) + word + rng.choice(SPACES)
+            word = f"{opening}{inner}{opening.strip()}"
+        parts.append(word)
+        parts.append(rng.choice(SPACES))
+    return "".join(parts)
+
+
+def visible(page: str, parse_mode: str | None) -> str:
+    if parse_mode == "HTML":
+        return unescape(HTML_TAG.sub("", page))
+    if parse_mode in MARKDOWN_MARKUP:
+        return MARKDOWN_MARKUP[parse_mode].sub(lambda match: match.group(1) or "", page)
+    return page
+
+
+def without_whitespace(text: str) -> str:
+    return re.sub(r"\s", "", text)
+
+
+def assert_balanced(page: str) -> None:
+    stack = []
+    for closing, name in HTML_TAG.findall(page):
+        if closing:
+            assert stack and stack.pop() == name, page
+        else:
+            stack.append(name)
+    assert not stack, page
+
+
+def assert_balanced_markdown(page: str, parse_mode: str) -> None:
+    stack = []
+    for match in MARKDOWN_MARKUP[parse_mode].finditer(page):
+        if match.group(1) is not None:
+            continue
+        delimiter = match.group().strip()
+        if stack and stack[-1] == delimiter:
+            stack.pop()
+        else:
+            stack.append(delimiter)
+    assert not stack, page
+
+
+def assert_escapes_whole(page: str, parse_mode: str) -> None:
+    # a backslash left over once the escapes are removed is half of a split one
+    assert "\\" not in MARKDOWN_ESCAPE[parse_mode].sub("", page), page
+
+
+def check_pages(text: str, limit: int, parse_mode: str | None) -> None:
+    pages = Paginator(limit, parse_mode).paginate(text)
+    for page in pages:
+        assert utf16_length(visible(page, parse_mode)) <= limit, (limit, page)
+        assert visible(page, parse_mode).strip(), (text, pages)
+        if parse_mode == "HTML":
+            assert_balanced(page)
+        elif parse_mode in MARKDOWN_MARKUP:
+            assert_balanced_markdown(page, parse_mode)
+            assert_escapes_whole(page, parse_mode)
+    joined = "".join(visible(page, parse_mode) for page in pages)
+    assert without_whitespace(joined) == without_whitespace(visible(text, parse_mode)), (text, pages)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_plain_pages_properties(seed: int) -> None:
+    rng = random.Random(seed)
+    check_pages(random_text(rng), rng.randint(8, 40), None)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_html_pages_properties(seed: int) -> None:
+    rng = random.Random(seed)
+    check_pages(random_text(rng, "HTML"), rng.randint(12, 40), "HTML")
+
+
+@pytest.mark.parametrize("parse_mode", ["Markdown", "MarkdownV2"])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_markdown_pages_properties(seed: int, parse_mode: str) -> None:
+    rng = random.Random(seed)
+    check_pages(random_text(rng, parse_mode), rng.randint(16, 40), parse_mode)
+
+
+@pytest.mark.parametrize(
+    ("limit", "text", "pages"),
+    [
+        (5, "b bab\n   aaa", ["b bab", "aaa"]),
+        (5, "\t\t\té😀", ["é😀"]),
+        (8, "<code>        </code>x", ["x"]),
+        (8, "<b>Hi.</b> <b>   there friend</b>", ["<b>Hi.</b>", "<b>there</b>", "<b>friend</b>"]),
+    ],
+)
+def test_leading_whitespace_never_makes_a_page(limit: int, text: str, pages: list[str]) -> None:
+    assert Paginator(limit, "HTML" if "<" in text else None).paginate(text) == pages
+
+
+def test_whitespace_inside_code_is_kept() -> None:
+    assert Paginator(8, "HTML").paginate("<code>ab   cd  ef</code>") == [
+        "<code>ab   cd </code>",
+        "<code> ef</code>",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("limit", "parse_mode", "text", "pages"),
+    [
+        (8, "MarkdownV2", "é  _\n\n\nxy  _\nend", ["é", "_xy  _", "end"]),
+        (20, "Markdown", "```\ncode\n```\tok\\` and more words here", ["```\ncode\n```\tok\\`", "and more words here"]),
+    ],
+)
+def test_markdown_cuts_keep_entities_and_escapes(limit: int, parse_mode: str, text: str, pages: list[str]) -> None:
+    assert Paginator(limit, parse_mode).paginate(text) == pages
+
+
+@pytest.mark.parametrize("text", ["", "   ", "\n\n\t", "<b>  </b>", "<code></code>"])
+def test_blank_text_has_no_pages(text: str) -> None:
+    assert Paginator(10, "HTML").paginate(text) == []
+
+
+@pytest.mark.parametrize(
+    ("value", "parse_mode"),
+    [(None, None), ("", None), ("html", "HTML"), (" markdown ", "Markdown"), ("MARKDOWNV2", "MarkdownV2")],
+)
+def test_parse_mode_is_normalized(value: str | None, parse_mode: str | None) -> None:
+    assert normalize_parse_mode(value) == parse_mode
+
+
+def test_unknown_parse_mode_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        normalize_parse_mode("markup")
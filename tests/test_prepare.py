@@ -0,0 +1,120 @@
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+from sentence_bert.benchmarks.fixtures import random_vectors, write_knowledge_base
+from sentence_bert.src.application.interactors import PrepareKnowledgeBaseInteractor
+from sentence_bert.src.domain.entities import AnswerBaseDataDm
+from sentence_bert.src.infrastructure.gateways import (
+    KNOWLEDGE_BASE_VERSION_KEY,
+    EmbeddingsSnapshotGateway,
+    KnowledgeBasePrepareGateway
+)
+from sentence_bert.src.infrastructure.index_file import IndexFileGateway
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+from sentence_bert.src.infrastructure.single_flight import SingleFlightBuildGateway
+
+
+class RecordingEncoder:
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    async def encode_knowledge_base(self, knowledge_base: AnswerBaseDataDm) -> np.ndarray:
+        self.encoded.extend(knowledge_base.answers)
+        return random_vectors(len(knowledge_base.answers), 16, seed=len(self.encoded))
+
+
+def make_interactor(redis, config, redis_config, encoder) -> PrepareKnowledgeBaseInteractor:
+    metrics = MetricsRegistry()
+    prepare = KnowledgeBasePrepareGateway(redis, config, redis_config, metrics)
+    index_file = IndexFileGateway(config)
+    return PrepareKnowledgeBaseInteractor(
+        base_loader=prepare,
+        paginator=prepare,
+        encoder_gateway=encoder,
+        enum_gateway=prepare,
+        cache=prepare,
+        embeddings_getter=EmbeddingsSnapshotGateway(redis, config, redis_config, index_file, metrics),
+        index_file=index_file,
+        build_lock=SingleFlightBuildGateway(redis, config, metrics),
+    )
+
+
+def read_rows(path: Path) -> list[str]:
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+async def stored_ids(redis, prefix: str) -> set[str]:
+    return {key.decode().split(":", 1)[1] async for key in redis.scan_iter(match=f"{prefix}:*")}
+
+
+def test_first_build_encodes_every_row(make_bert_config, redis_config, redis) -> None:
+    config = make_bert_config()
+    write_knowledge_base(Path(config.base_path), 30)
+    encoder = RecordingEncoder()
+    asyncio.run(make_interactor(redis, config, redis_config, encoder)())
+    assert len(encoder.encoded) == 30
+    assert asyncio.run(redis.get(KNOWLEDGE_BASE_VERSION_KEY)) == b"1"
+    assert len(asyncio.run(stored_ids(redis, "embedding"))) == 30
+    assert len(IndexFileGateway(config).load_index_file().index) == 30
+
+
+def test_blank_answers_are_skipped_and_counted(make_bert_config, redis_config, redis) -> None:
+    config = make_bert_config()
+    path = write_knowledge_base(Path(config.base_path), 5)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("5~\n6~   \t \n")
+    metrics = MetricsRegistry()
+    prepare = KnowledgeBasePrepareGateway(redis, config, redis_config, metrics)
+
+    async def read_answers() -> list[str]:
+        return [answer async for chunk in prepare.stream_csv() for answer in chunk.answers]
+
+    answers = asyncio.run(read_answers())
+    assert answers == [row.split("~", 1)[1] for row in read_rows(path)[:5]]
+    assert "sentence_bert_knowledge_base_blank_rows_total 2" in metrics.render()
+
+
+def test_unchanged_csv_encodes_nothing(make_bert_config, redis_config, redis) -> None:
+    config = make_bert_config()
+    write_knowledge_base(Path(config.base_path), 30)
+    asyncio.run(make_interactor(redis, config, redis_config, RecordingEncoder())())
+    encoder = RecordingEncoder()
+    asyncio.run(make_interactor(redis, config, redis_config, encoder)())
+    assert encoder.encoded == []
+    assert asyncio.run(redis.get(KNOWLEDGE_BASE_VERSION_KEY)) == b"1"
+
+
+def test_edit_and_delete_touch_only_those_rows(make_bert_config, redis_config, redis) -> None:
+    config = make_bert_config()
+    path = write_knowledge_base(Path(config.base_path), 30)
+    asyncio.run(make_interactor(redis, config, redis_config, RecordingEncoder())())
+    before = asyncio.run(stored_ids(redis, "embedding"))
+
+    rows = read_rows(path)
+    edited = rows[3] + " word7"
+    rows[3] = edited
+    del rows[5]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    encoder = RecordingEncoder()
+    asyncio.run(make_interactor(redis, config, redis_config, encoder)())
+
+    assert encoder.encoded == [edited.split("~", 1)[1]]
+    after = asyncio.run(stored_ids(redis, "embedding"))
+    assert len(before - after) == 2 and len(after - before) == 1
+    assert asyncio.run(stored_ids(redis, "answer")) == after
+    assert asyncio.run(redis.get(KNOWLEDGE_BASE_VERSION_KEY)) == b"2"
+    snapshot = IndexFileGateway(config).load_index_file()
+    assert snapshot.version == 2 and set(snapshot.index.keys) == after
+
+
+def test_rows_left_by_an_interrupted_build_are_committed(make_bert_config, redis_config, redis) -> None:
+    config = make_bert_config()
+    write_knowledge_base(Path(config.base_path), 10)
+    asyncio.run(make_interactor(redis, config, redis_config, RecordingEncoder())())
+    asyncio.run(redis.delete(KNOWLEDGE_BASE_VERSION_KEY))
+    encoder = RecordingEncoder()
+    asyncio.run(make_interactor(redis, config, redis_config, encoder)())
+    assert encoder.encoded == []
+    assert asyncio.run(redis.get(KNOWLEDGE_BASE_VERSION_KEY)) == b"1"
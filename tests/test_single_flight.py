@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from redis.exceptions import LockNotOwnedError
+
+from sentence_bert.src.infrastructure.gateways import KNOWLEDGE_BASE_VERSION_KEY
+from sentence_bert.src.infrastructure.metrics import MetricsRegistry
+from sentence_bert.src.infrastructure.single_flight import BUILD_LOCK_KEY, SingleFlightBuildGateway
+
+
+@pytest.fixture
+def config(make_bert_config):
+    return make_bert_config(BERT_BUILD_LOCK_LEASE=0.6, BERT_BUILD_WAIT_TIMEOUT=2)
+
+
+def make_gateways(redis, config, count: int) -> list[SingleFlightBuildGateway]:
+    return [SingleFlightBuildGateway(redis, config, MetricsRegistry()) for _ in range(count)]
+
+
+def committing_build(redis, builds: list[str], seconds: float = 0.3):
+    async def build() -> None:
+        builds.append("build")
+        await asyncio.sleep(seconds)
+        await redis.incr(KNOWLEDGE_BASE_VERSION_KEY)
+
+    return build
+
+
+def test_concurrent_callers_in_one_process_share_one_build(redis, config) -> None:
+    (gateway,) = make_gateways(redis, config, 1)
+    builds: list[str] = []
+    build = committing_build(redis, builds)
+
+    async def run() -> None:
+        await asyncio.gather(*(gateway.run_once(build) for _ in range(10)))
+
+    asyncio.run(run())
+    assert builds == ["build"]
+
+
+def test_concurrent_workers_elect_one_builder(redis, config) -> None:
+    builds: list[str] = []
+    build = committing_build(redis, builds)
+
+    async def run() -> None:
+        await asyncio.gather(*(gateway.run_once(build) for gateway in make_gateways(redis, config, 5)))
+
+    asyncio.run(run())
+    assert builds == ["build"]
+    assert asyncio.run(redis.get(KNOWLEDGE_BASE_VERSION_KEY)) == b"1"
+    assert not asyncio.run(redis.exists(BUILD_LOCK_KEY))
+
+
+def test_waiter_builds_when_the_builder_fails(redis, config) -> None:
+    builder, waiter = make_gateways(redis, config, 2)
+    builds: list[str] = []
+
+    async def crash() -> None:
+        builds.append("crash")
+        await asyncio.sleep(0.3)
+        raise RuntimeError("boom")
+
+    async def run() -> list:
+        return await asyncio.gather(
+            builder.run_once(crash), waiter.run_once(committing_build(redis, builds, 0)), return_exceptions=True
+        )
+
+    first, second = asyncio.run(run())
+    assert isinstance(first, RuntimeError) and second is None
+    assert builds == ["crash", "build"]
+
+
+def test_waiter_times_out_while_the_lock_is_held(redis, config) -> None:
+    (gateway,) = make_gateways(redis, config, 1)
+    asyncio.run(redis.set(BUILD_LOCK_KEY, "other", px=10_000))
+    builds: list[str] = []
+    with pytest.raises(TimeoutError):
+        asyncio.run(gateway.run_once(committing_build(redis, builds)))
+    assert builds == []
+
+
+def test_build_that_lost_its_lease_does_not_finish(redis, config) -> None:
+    (gateway,) = make_gateways(redis, config, 1)
+    steps: list[str] = []
+
+    async def taken_over() -> None:
+        await redis.set(BUILD_LOCK_KEY, "other", px=10_000)
+        await asyncio.sleep(1)
+        steps.append("commit")
+
+    with pytest.raises(LockNotOwnedError):
+        asyncio.run(gateway.run_once(taken_over))
+    assert steps == []
+
+
+def test_ensure_held_fails_once_the_lock_is_gone(redis, config) -> None:
+    (gateway,) = make_gateways(redis, config, 1)
+    steps: list[str] = []
+
+    async def check_before_commit() -> None:
+        await gateway.ensure_held()
+        steps.append("held")
+        await redis.set(BUILD_LOCK_KEY, "other", px=10_000)
+        await gateway.ensure_held()
+        steps.append("commit")
+
+    with pytest.raises(LockNotOwnedError):
+        asyncio.run(gateway.run_once(check_before_commit))
+    assert steps == ["held"]